@@ -0,0 +1,208 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+import evidencias
+
+AGENDA_FILE = os.environ.get("SCHEDULE_FILE", "agenda.json")
+AGENDA_HORARIOS = os.environ.get("SCHEDULE_TIMES", "")
+AGENDA_TZ = os.environ.get("SCHEDULE_TZ", "America/Sao_Paulo")
+AGENDA_ANTECEDENCIA = int(os.environ.get("SCHEDULE_LEAD_SECONDS", "90"))
+AGENDA_HISTORICO = int(os.environ.get("SCHEDULE_HISTORY_MAX", "100"))
+
+# segunda a sexta (datetime.weekday), igual ao workflow do GitHub Actions
+DIAS_PADRAO = [0, 1, 2, 3, 4]
+
+
+def carregar_agenda(caminho=AGENDA_FILE):
+    """
+    Lê a agenda de um JSON no formato:
+    {"timezone": "America/Sao_Paulo",
+     "usuarios": [{"usuario": "...", "senha": "...", "horarios": ["06:00", "12:15"], "dias": [0, 1, 2, 3, 4]}]}
+
+    Sem arquivo, usa SCHEDULE_TIMES ("06:00,10:00,...") para SENIOR_USER/SENIOR_PASSWORD.
+    Devolve (fuso, lista de entradas) — lista vazia se não houver agenda.
+    """
+    if os.path.exists(caminho):
+        with open(caminho, "r", encoding="utf-8") as f:
+            dados = json.load(f)
+        fuso = dados.get("timezone", AGENDA_TZ)
+        usuarios = dados.get("usuarios", [])
+    elif AGENDA_HORARIOS.strip():
+        fuso = AGENDA_TZ
+        usuarios = [{"horarios": AGENDA_HORARIOS.split(",")}]
+    else:
+        return ZoneInfo(AGENDA_TZ), []
+
+    entradas = []
+    for u in usuarios:
+        usuario = u.get("usuario") or os.environ.get("SENIOR_USER")
+        senha = u.get("senha") or os.environ.get("SENIOR_PASSWORD")
+        if not usuario or not senha:
+            raise ValueError("Agenda com usuário sem credenciais (informe 'usuario'/'senha' ou SENIOR_USER/SENIOR_PASSWORD).")
+        dias = u.get("dias", DIAS_PADRAO)
+        for horario in u.get("horarios", []):
+            if not str(horario).strip():
+                continue  # item vazio, ex.: vírgula sobrando em "06:00,12:15,"
+            entradas.append({
+                "usuario": usuario,
+                "senha": senha,
+                "horario": _ler_horario(horario),
+                "dias": dias,
+                "ultimo_alvo": None,
+            })
+    return ZoneInfo(fuso), entradas
+
+
+def _ler_horario(horario):
+    """'HH:MM' ou 'HH:MM:SS' -> (hora, minuto, segundo); ValueError citando a entrada inválida."""
+    try:
+        partes = [int(p) for p in str(horario).strip().split(":")]
+    except ValueError:
+        partes = []
+    if not 1 <= len(partes) <= 3:
+        raise ValueError(f"Horário inválido na agenda: {horario!r} (use HH:MM ou HH:MM:SS).")
+    hora, minuto, segundo = (partes + [0, 0])[:3]
+    if not (0 <= hora <= 23 and 0 <= minuto <= 59 and 0 <= segundo <= 59):
+        raise ValueError(f"Horário inválido na agenda: {horario!r} (use HH:MM ou HH:MM:SS).")
+    return hora, minuto, segundo
+
+
+def _proxima_ocorrencia(entrada, agora):
+    hora, minuto, segundo = entrada["horario"]
+    base = agora.replace(hour=hora, minute=minuto, second=segundo, microsecond=0)
+    for dias in range(8):
+        alvo = base + timedelta(days=dias)
+        if alvo <= agora or alvo.weekday() not in entrada["dias"]:
+            continue
+        if entrada["ultimo_alvo"] is not None and alvo <= entrada["ultimo_alvo"]:
+            continue
+        return alvo
+    return None
+
+
+def _perdidas(entrada, desde, agora):
+    """Alvos de `entrada` em (desde, agora] que passaram sem serem disparados."""
+    hora, minuto, segundo = entrada["horario"]
+    base = desde.replace(hour=hora, minute=minuto, second=segundo, microsecond=0)
+    perdidas = []
+    for dias in range((agora.date() - desde.date()).days + 1):
+        alvo = base + timedelta(days=dias)
+        if not desde < alvo <= agora or alvo.weekday() not in entrada["dias"]:
+            continue
+        if entrada["ultimo_alvo"] is not None and alvo <= entrada["ultimo_alvo"]:
+            continue
+        perdidas.append(alvo)
+    return perdidas
+
+
+class Agendador:
+    """
+    Agendador interno: dispara o registro de ponto de cada usuário no segundo
+    exato da agenda, sem depender de um cron externo.
+
+    A execução começa SCHEDULE_LEAD_SECONDS antes do alvo (navegador aquecido,
+    login e botão localizado) e o clique é segurado até o instante do alvo.
+    O desvio entre o clique e o alvo fica registrado no histórico, assim como
+    os alvos perdidos (processo suspenso ou atrasado além do horário).
+    """
+
+    def __init__(self, navegador, fuso, entradas, antecedencia_s=AGENDA_ANTECEDENCIA):
+        self._navegador = navegador
+        self.fuso = fuso
+        self._entradas = entradas
+        self._antecedencia = timedelta(seconds=antecedencia_s)
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._laco, name="agendador", daemon=True)
+        self._historico = deque(maxlen=AGENDA_HISTORICO)
+        self._lock = threading.Lock()
+
+    def iniciar(self):
+        if self._entradas:
+            self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+
+    def proximos(self):
+        agora = datetime.now(self.fuso)
+        itens = []
+        for e in self._entradas:
+            alvo = _proxima_ocorrencia(e, agora)
+            if alvo is not None:
+                itens.append({"user": e["usuario"], "target": alvo.isoformat()})
+        return sorted(itens, key=lambda i: i["target"])
+
+    def historico(self):
+        with self._lock:
+            return list(self._historico)
+
+    def _laco(self):
+        visto_ate = datetime.now(self.fuso)
+        while not self._parar.is_set():
+            agora = datetime.now(self.fuso)
+            self._registrar_perdidas(visto_ate, agora)
+            visto_ate = agora
+            pendentes = [(a, e) for e in self._entradas if (a := _proxima_ocorrencia(e, agora)) is not None]
+            if not pendentes:
+                return
+            alvo = min(a for a, _ in pendentes)
+
+            espera = (alvo - self._antecedencia - agora).total_seconds()
+            if espera > 0:
+                # acorda no máximo a cada minuto para não acumular desvio do relógio
+                self._parar.wait(min(espera, 60))
+                continue
+
+            # todos os usuários com o mesmo alvo saem juntos (no loop do navegador)
+            for a, entrada in pendentes:
+                if a == alvo:
+                    entrada["ultimo_alvo"] = alvo
+                    self._navegador.submeter(lambda browser, e=entrada, a=alvo: self._executar(browser, e, a))
+
+    def _registrar_perdidas(self, desde, agora):
+        # _proxima_ocorrencia só olha para frente: sem isso, um alvo que passou
+        # enquanto o laço dormia sumiria sem deixar rastro
+        for entrada in self._entradas:
+            for alvo in _perdidas(entrada, desde, agora):
+                entrada["ultimo_alvo"] = alvo
+                with self._lock:
+                    self._historico.append({
+                        "user": entrada["usuario"],
+                        "run_id": None,
+                        "target": alvo.isoformat(),
+                        "status": "missed",
+                        "deviation_s": None,
+                        "duration_s": None,
+                        "log": f"Alvo perdido: o agendador só acordou às {agora.strftime('%H:%M:%S')}.",
+                    })
+
+    async def _executar(self, browser, entrada, alvo):
+        import script  # tardio: carregar a agenda no boot não importa o Playwright
+
+        log, medicoes = [], {}
+        execucao_id = evidencias.novo_id()
+        inicio = time.perf_counter()
+        try:
+            await script.registrar_ponto_async(browser, usuario=entrada["usuario"], senha=entrada["senha"],
+                                               log=log, alvo=alvo, medicoes=medicoes, execucao_id=execucao_id)
+            status, erro = "success", None
+        except Exception as e:
+            status, erro = "error", str(e)
+
+        registro = {
+            "user": entrada["usuario"],
+            "run_id": execucao_id,
+            "target": alvo.isoformat(),
+            "status": status,
+            "deviation_s": medicoes.get("desvio_clique_s"),
+            "duration_s": round(time.perf_counter() - inicio, 3),
+            "log": "\n".join(log),
+        }
+        if erro:
+            registro["error"] = erro
+        with self._lock:
+            self._historico.append(registro)
@@ -0,0 +1,221 @@
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import requests
+from urllib3.exceptions import NewConnectionError
+import metricas
+from sessao import carregar_sessao, descartar_sessao, salvar_sessao
+
+# "navegador" (padrão): sempre Playwright. "api": depois da primeira marcação pelo
+# navegador, repete a mesma chamada REST direto, sem renderizar nada.
+PONTO_MODO = os.environ.get("CLOCKING_MODE", "navegador")
+
+# Requisição do SPA do ponto que efetivamente registra a marcação
+PADRAO_REQUISICAO = re.compile(os.environ.get("CLOCKING_REQUEST_PATTERN", r"clocking-?event"), re.I)
+API_TIMEOUT = float(os.environ.get("CLOCKING_API_TIMEOUT", "15"))
+
+# Datas sem fuso no corpo capturado foram geradas pelo navegador, que roda neste fuso
+FUSO = ZoneInfo("America/Sao_Paulo")
+
+# Cabeçalhos que o próprio cliente HTTP recalcula (ou que são pseudo-cabeçalhos do HTTP/2)
+_NAO_REPETIR = {"host", "content-length", "connection", "accept-encoding", "transfer-encoding"}
+
+_DATA_ISO = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?$")
+
+_local = threading.local()
+
+# Respostas que garantem que a marcação não foi aceita (token recusado): dá para
+# repetir pelo navegador sem risco de registrar o ponto duas vezes
+_RECUSADO = {401, 403}
+
+
+class ResultadoIncerto(RuntimeError):
+    """A chamada pode ter chegado ao servidor: não dá para saber se o ponto foi registrado."""
+
+
+def ativo():
+    return PONTO_MODO == "api"
+
+
+def _cliente():
+    # uma Session por thread: reaproveita conexões (keep-alive/TLS) entre marcações
+    if getattr(_local, "sessao", None) is None:
+        _local.sessao = requests.Session()
+    return _local.sessao
+
+
+class CapturaRequisicao:
+    """Escuta o contexto e guarda a primeira requisição de marcação enviada pelo SPA."""
+
+    def __init__(self, context):
+        self.requisicao = None
+        self._context = context
+        context.on("request", self._ao_requisitar)
+
+    def _ao_requisitar(self, request):
+        if self.requisicao is None and request.method in ("POST", "PUT") and PADRAO_REQUISICAO.search(request.url):
+            self.requisicao = request
+
+    async def salvar(self, usuario, senha, log):
+        """Grava o modelo (URL, método, cabeçalhos com o token, corpo) se a marcação deu certo."""
+        self._context.remove_listener("request", self._ao_requisitar)
+        if self.requisicao is None:
+            log.append("Modo API: nenhuma requisição de marcação capturada.")
+            return
+        try:
+            modelo = self._modelo(await self.requisicao.response(), await self.requisicao.all_headers(), log)
+            if modelo is not None:
+                # o Scrypt do cache leva dezenas de ms: fora do event loop
+                await asyncio.to_thread(salvar_sessao, usuario, senha, modelo, tipo="api")
+                log.append(f"Modo API: modelo da marcação capturado ({modelo['metodo']} {modelo['url']}).")
+        except Exception as e:
+            log.append(f"Modo API: não foi possível capturar o modelo: {e}")
+
+    def _modelo(self, resposta, cabecalhos, log):
+        if resposta is None or not resposta.ok:
+            log.append("Modo API: requisição capturada não teve sucesso; modelo não salvo.")
+            return None
+        return {
+            "url": self.requisicao.url,
+            "metodo": self.requisicao.method,
+            "cabecalhos": {
+                k: v for k, v in cabecalhos.items()
+                if not k.startswith(":") and k.lower() not in _NAO_REPETIR
+            },
+            "corpo": self.requisicao.post_data,
+        }
+
+
+def _atualizar_horarios(valor, agora):
+    """Troca datas ISO do corpo capturado pelo horário atual, no mesmo formato e fuso."""
+    if isinstance(valor, dict):
+        return {k: _atualizar_horarios(v, agora) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return [_atualizar_horarios(v, agora) for v in valor]
+    if isinstance(valor, str) and _DATA_ISO.match(valor):
+        try:
+            original = datetime.fromisoformat(valor.replace("Z", "+00:00"))
+        except ValueError:
+            return valor
+        precisao = "milliseconds" if "." in valor else "seconds"
+        if original.tzinfo is None:
+            return agora.replace(tzinfo=None).isoformat(timespec=precisao)
+        novo = agora.astimezone(original.tzinfo).isoformat(timespec=precisao)
+        return novo.replace("+00:00", "Z") if valor.endswith("Z") else novo
+    return valor
+
+
+def registrar_via_api(usuario, senha, log, alvo=None, medicoes=None):
+    """
+    Repete a marcação capturada com um cliente HTTP. Devolve True se registrou,
+    None se ainda não há modelo salvo e False se a chamada comprovadamente não
+    registrou nada (não conectou ou o token foi recusado com 401/403; o modelo é
+    descartado). Nos dois últimos casos o chamador cai para o fluxo do navegador.
+
+    Se a requisição pode ter chegado ao servidor (timeout de leitura, conexão
+    caída depois do envio, 5xx, outro erro HTTP), levanta ResultadoIncerto em vez
+    de clicar de novo pelo navegador e arriscar uma marcação duplicada.
+    """
+    medicoes = {} if medicoes is None else medicoes
+    modelo = carregar_sessao(usuario, senha, tipo="api")
+    if modelo is None:
+        return None
+
+    corpo = modelo["corpo"]
+    if alvo is not None:
+        restante = alvo.timestamp() - time.time()
+        if restante > 0:
+            log.append(f"Modo API: aguardando {restante:.1f}s até o alvo.")
+            time.sleep(restante)
+
+    try:
+        dados = json.loads(corpo) if corpo else None
+    except ValueError:
+        dados = None
+    if dados is not None:
+        corpo = json.dumps(_atualizar_horarios(dados, datetime.now(FUSO)))
+
+    try:
+        resposta = _cliente().request(
+            modelo["metodo"], modelo["url"], headers=modelo["cabecalhos"],
+            data=corpo.encode("utf-8") if corpo else None, timeout=API_TIMEOUT
+        )
+    except (requests.ConnectTimeout, requests.exceptions.SSLError) as e:
+        log.append(f"Modo API: não conectou ({e}). Voltando para o navegador.")
+        descartar_sessao(usuario, tipo="api")
+        return False
+    except requests.RequestException as e:
+        if _nao_enviada(e):
+            log.append(f"Modo API: não conectou ({e}). Voltando para o navegador.")
+            descartar_sessao(usuario, tipo="api")
+            return False
+        log.append(f"Modo API: falha de rede depois de enviar ({e}). Não vou repetir pelo navegador.")
+        raise ResultadoIncerto(
+            "Modo API: não dá para saber se o ponto foi registrado (falha de rede depois do envio). "
+            "Confira no Senior antes de marcar de novo."
+        ) from e
+
+    if alvo is not None:
+        medicoes["desvio_clique_s"] = round(time.time() - alvo.timestamp(), 3)
+
+    if resposta.status_code in _RECUSADO:
+        log.append(f"Modo API: HTTP {resposta.status_code} (token recusado). Voltando para o navegador.")
+        descartar_sessao(usuario, tipo="api")
+        return False
+
+    if not resposta.ok:
+        log.append(f"Modo API: HTTP {resposta.status_code} ({resposta.text[:200]!r}). Não vou repetir pelo navegador.")
+        if resposta.status_code < 500:
+            # o modelo provavelmente ficou inválido; o próximo registro recaptura pelo navegador
+            descartar_sessao(usuario, tipo="api")
+        raise ResultadoIncerto(
+            f"Modo API: HTTP {resposta.status_code}; não dá para saber se o ponto foi registrado. "
+            "Confira no Senior antes de marcar de novo."
+        )
+
+    log.append(f"Modo API: ponto registrado direto pela API (HTTP {resposta.status_code}).")
+    return True
+
+
+def _nao_enviada(erro):
+    """True se a conexão nem chegou a ser aberta (DNS, recusa, rota), logo nada foi enviado."""
+    causa, vistos = erro, set()
+    while causa is not None and id(causa) not in vistos:
+        if isinstance(causa, NewConnectionError):
+            return True
+        vistos.add(id(causa))
+        # requests -> MaxRetryError.reason -> NewConnectionError
+        motivo = getattr(causa, "reason", None)
+        causa = motivo if isinstance(motivo, BaseException) else (causa.__cause__ or causa.__context__)
+    return False
+
+
+def tentar(usuario, senha, log, alvo, medicoes, rastreio):
+    """
+    Passo do modo API antes de abrir o navegador (script.py chama numa thread):
+    True se a marcação saiu pela API e o navegador nem precisa abrir. Repassa
+    ResultadoIncerto: nesse caso o navegador não deve rodar.
+    """
+    rastreio.fase("api")
+    try:
+        via_api = registrar_via_api(usuario, senha, log, alvo, medicoes)
+    except ResultadoIncerto:
+        metricas.ESTRATEGIAS.incrementar("api", "incerto")
+        metricas.EXECUCOES.incrementar("incerto")
+        raise
+    finally:
+        rastreio.encerrar()
+    if via_api:
+        metricas.ESTRATEGIAS.incrementar("api", "sucesso")
+        metricas.EXECUCOES.incrementar("sucesso")
+        medicoes["fases"] = rastreio.resumo()
+        log.append(rastreio.resumo_texto())
+        return True
+    if via_api is False:
+        metricas.ESTRATEGIAS.incrementar("api", "falha")
+    return False
@@ -1,69 +1,149 @@
+import atexit
+import importlib
 import os
 import threading
-from flask import Flask, jsonify, request
-import script
+from flask import Flask, Response, jsonify, request
+import metricas
+import respostas
+from agendador import Agendador, carregar_agenda
+from fila import FilaExecucoes
+from navegador import GerenciadorNavegador
+
+# script/lote (e com eles o Playwright) só são importados fora do boot:
+# o gunicorn já responde enquanto o aquecimento roda em segundo plano.
 
 app = Flask(__name__)
 
 execucao_lock = threading.Lock()
 
+# Chromium aquecido desde o boot: cada /run só abre um contexto novo nele
+navegador = GerenciadorNavegador()
+atexit.register(navegador.parar)
+erro_aquecimento = None
+
+
+def _aquecer():
+    """Lança o Chromium e, em paralelo, importa o fluxo; marca cada etapa em metricas.INICIO."""
+    global erro_aquecimento
+    try:
+        pronto = navegador.iniciar()
+        importlib.import_module("script")  # só para deixar o módulo carregado antes do primeiro /run
+        metricas.marcar_inicio("script_importado")
+        pronto.result()
+        metricas.marcar_inicio("navegador_pronto")
+    except Exception as e:
+        erro_aquecimento = str(e)
+
+
+threading.Thread(target=_aquecer, name="aquecimento", daemon=True).start()
+
+# /run só enfileira; o registro roda em segundo plano e é consultado em /jobs/<id>
+fila = FilaExecucoes()
+atexit.register(fila.parar)
+
+# Agendador interno (SCHEDULE_FILE ou SCHEDULE_TIMES): clique no segundo exato, sem cron externo
+agendador = Agendador(navegador, *carregar_agenda())
+agendador.iniciar()
+atexit.register(agendador.parar)
+
+
+metricas.marcar_inicio("app_importado")
+
 
 def autorizado():
-    """
-    Segurança opcional:
-    Se você definir RUN_TOKEN no Railway, será necessário chamar:
-    /run?token=SEU_TOKEN
-    ou enviar header X-RUN-TOKEN.
-    """
-    token_configurado = os.environ.get("RUN_TOKEN")
+    return respostas.token_valido(request.headers.get("X-RUN-TOKEN") or request.args.get("token"))
 
-    if not token_configurado:
-        return True
 
-    token_recebido = request.headers.get("X-RUN-TOKEN") or request.args.get("token")
-    return token_recebido == token_configurado
+def responder(resposta):
+    corpo, status = resposta
+    return jsonify(corpo), status
 
 
 @app.route("/", methods=["GET"])
 def home():
-    return jsonify({
-        "status": "online",
-        "message": "API do registro de ponto funcionando",
-        "busy": execucao_lock.locked()
-    }), 200
+    ocupado = execucao_lock.locked() or fila.resumo()["running"] > 0
+    return responder(respostas.online(navegador, fila, ocupado))
+
+
+@app.route("/ready", methods=["GET"])
+def ready():
+    return responder(respostas.pronto(navegador, erro_aquecimento))
 
 
 @app.route("/run", methods=["GET", "POST"])
 def run():
     if not autorizado():
-        return jsonify({
-            "status": "unauthorized",
-            "message": "Token inválido ou ausente."
-        }), 401
+        return responder(respostas.NAO_AUTORIZADO)
+
+    # ?evidence=1 força screenshot/HTML mesmo com sucesso (padrão: EVIDENCE_MODE)
+    evidencia = True if request.args.get("evidence") in ("1", "true") else None
+
+    import script
+
+    def tarefa(log, job_id):
+        navegador.submeter(lambda browser: script.registrar_ponto_async(
+            browser, log=log, evidencia=evidencia, execucao_id=job_id
+        )).result()
+
+    return responder(respostas.enfileirado(*fila.enfileirar(script.SENIOR_USER, tarefa)))
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    if not autorizado():
+        return responder(respostas.NAO_AUTORIZADO)
+
+    return responder(respostas.estado_job(fila.obter(job_id)))
+
+
+@app.route("/batch", methods=["POST"])
+def batch():
+    """
+    Registra o ponto de vários usuários de uma vez.
+    Corpo: {"usuarios": [{"usuario": "...", "senha": "..."}]}
+    Sem corpo, lê o arquivo BATCH_CREDENTIALS_FILE; JSON malformado dá 400.
+    """
+    if not autorizado():
+        return responder(respostas.NAO_AUTORIZADO)
+
+    try:
+        credenciais = respostas.credenciais_lote(request.get_data())
+    except (OSError, ValueError) as e:
+        return responder(respostas.invalido(e))
 
     if not execucao_lock.acquire(blocking=False):
-        return jsonify({
-            "status": "busy",
-            "message": "Já existe uma execução em andamento. Aguarde finalizar antes de chamar novamente."
-        }), 409
+        return responder(respostas.OCUPADO)
 
     try:
-        log = script.registrar_ponto()
-        return jsonify({
-            "status": "success",
-            "log": log
-        }), 200
+        import lote
+
+        return responder(respostas.relatorio_lote(lote.registrar_lote(navegador, credenciais)))
 
     except Exception as e:
-        return jsonify({
-            "status": "error",
-            "error": str(e)
-        }), 500
+        return responder(respostas.erro(e))
 
     finally:
         execucao_lock.release()
 
 
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Métricas no formato texto do Prometheus (fases, seletores, execuções, fila)."""
+    return Response(metricas.renderizar(respostas.gauges(navegador, fila)), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/schedule", methods=["GET"])
+def schedule():
+    if not autorizado():
+        return responder(respostas.NAO_AUTORIZADO)
+
+    return jsonify({
+        "timezone": str(agendador.fuso),
+        "next": agendador.proximos(),
+        "history": agendador.historico()
+    }), 200
+
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", "8080"))
 
@@ -0,0 +1,179 @@
+import asyncio
+import importlib
+import json
+import os
+from urllib.parse import parse_qs
+import metricas
+import respostas
+from fila import FilaExecucoesAsync
+from navegador import NavegadorAsync
+
+# Servidor ASGI (uvicorn asgi:app): mesma API e mesmo motor do app.py para /, /run,
+# /jobs/<id>, /batch e /metrics, mas o NavegadorAsync roda direto no event loop do
+# servidor, sem a thread do GerenciadorNavegador. Como no app.py, o script (e com
+# ele o Playwright) só é importado no aquecimento ou no primeiro /run.
+
+navegador = NavegadorAsync()
+fila = FilaExecucoesAsync()
+execucao_lock = asyncio.Lock()
+erro_aquecimento = None
+
+
+def autorizado(cabecalhos, query):
+    """Mesma regra do app.py: RUN_TOKEN via header X-RUN-TOKEN ou ?token=."""
+    return respostas.token_valido(cabecalhos.get("x-run-token") or (query.get("token") or [None])[0])
+
+
+async def _responder(send, status, corpo, tipo="application/json"):
+    if not isinstance(corpo, bytes):
+        corpo = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", tipo.encode()), (b"content-length", str(len(corpo)).encode())],
+    })
+    await send({"type": "http.response.body", "body": corpo})
+
+
+async def _enviar(send, resposta):
+    """Envia um (corpo, status) montado pelo respostas.py."""
+    corpo, status = resposta
+    await _responder(send, status, corpo)
+
+
+async def _ler_corpo(receive):
+    partes = []
+    while True:
+        mensagem = await receive()
+        partes.append(mensagem.get("body", b""))
+        if not mensagem.get("more_body"):
+            return b"".join(partes)
+
+
+async def home(send, **_):
+    ocupado = execucao_lock.locked() or navegador.ativas > 0
+    await _enviar(send, respostas.online(
+        navegador, fila, ocupado, "API do registro de ponto funcionando (ASGI)",
+        active=navegador.ativas, max_concurrency=navegador.max_concorrencia
+    ))
+
+
+async def ready(send, **_):
+    await _enviar(send, respostas.pronto(navegador, erro_aquecimento))
+
+
+async def run(send, query, **_):
+    # ?evidence=1 força screenshot/HTML mesmo com sucesso (padrão: EVIDENCE_MODE)
+    evidencia = True if (query.get("evidence") or [None])[0] in ("1", "true") else None
+    import script  # tardio: já carregado pelo aquecimento, salvo no primeiro /run logo após o boot
+
+    async def tarefa(log, job_id):
+        await navegador.executar(lambda browser: script.registrar_ponto_async(
+            browser, log=log, evidencia=evidencia, execucao_id=job_id
+        ))
+
+    await _enviar(send, respostas.enfileirado(*fila.enfileirar(script.SENIOR_USER, tarefa)))
+
+
+async def job_status(send, job_id, **_):
+    await _enviar(send, respostas.estado_job(fila.obter(job_id)))
+
+
+async def batch(send, receive, **_):
+    """Mesmo corpo e relatório do POST /batch do app.py."""
+    try:
+        credenciais = respostas.credenciais_lote(await _ler_corpo(receive))
+    except (OSError, ValueError) as e:
+        return await _enviar(send, respostas.invalido(e))
+
+    if execucao_lock.locked():
+        return await _enviar(send, respostas.OCUPADO)
+
+    async with execucao_lock:
+        try:
+            import lote  # tardio, como no app.py
+
+            relatorio = await lote.registrar_lote_async(navegador, credenciais)
+        except Exception as e:
+            return await _enviar(send, respostas.erro(e))
+
+    await _enviar(send, respostas.relatorio_lote(relatorio))
+
+
+async def metrics(send, **_):
+    extras = respostas.gauges(navegador, fila) + [
+        metricas.gauge("ponto_navegador_execucoes_ativas", "Execuções abertas agora no event loop.", navegador.ativas),
+    ]
+    await _responder(send, 200, metricas.renderizar(extras).encode("utf-8"), "text/plain; version=0.0.4")
+
+
+# (método, caminho) -> (handler, exige token)
+ROTAS = {
+    ("GET", "/"): (home, False),
+    ("GET", "/ready"): (ready, False),
+    ("GET", "/run"): (run, True),
+    ("POST", "/run"): (run, True),
+    ("POST", "/batch"): (batch, True),
+    ("GET", "/metrics"): (metrics, False),
+}
+
+
+async def _aquecer():
+    global erro_aquecimento
+    try:
+        lancamento = asyncio.ensure_future(navegador.iniciar())
+        # a importação do fluxo (Playwright incluso) roda numa thread enquanto o Chromium sobe
+        await asyncio.to_thread(importlib.import_module, "script")
+        metricas.marcar_inicio("script_importado")
+        await lancamento
+        metricas.marcar_inicio("navegador_pronto")
+    except Exception as e:
+        erro_aquecimento = str(e)
+
+
+async def _lifespan(receive, send):
+    while True:
+        mensagem = await receive()
+        if mensagem["type"] == "lifespan.startup":
+            # aquece o Chromium sem segurar o boot; a primeira execução espera por ele se preciso
+            aquecimento = asyncio.get_running_loop().create_task(_aquecer())
+            await send({"type": "lifespan.startup.complete"})
+        elif mensagem["type"] == "lifespan.shutdown":
+            aquecimento.cancel()
+            await fila.parar()
+            await navegador.parar()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+metricas.marcar_inicio("app_importado")
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await _lifespan(receive, send)
+    if scope["type"] != "http":
+        return
+
+    metodo, caminho = scope["method"], scope["path"]
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    cabecalhos = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+
+    handler, protegida, parametros = None, False, {}
+    if (metodo, caminho) in ROTAS:
+        handler, protegida = ROTAS[(metodo, caminho)]
+    elif metodo == "GET" and caminho.startswith("/jobs/") and caminho.count("/") == 2:
+        handler, protegida, parametros = job_status, True, {"job_id": caminho[len("/jobs/"):]}
+
+    if handler is None:
+        return await _responder(send, 404, {"status": "not_found", "message": "Rota não encontrada."})
+    if protegida and not autorizado(cabecalhos, query):
+        return await _enviar(send, respostas.NAO_AUTORIZADO)
+
+    await handler(send=send, receive=receive, query=query, **parametros)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=int(os.environ.get("PORT", "8080")))
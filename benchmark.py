@@ -0,0 +1,217 @@
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, wait
+from mock_senior import argumentos_mock, config_mock, iniciar_mock
+
+
+class AmostradorMemoria:
+    """
+    Amostra periodicamente o RSS somado deste processo e de todos os filhos
+    (driver do Playwright + processos do Chromium) lendo o /proc. Só Linux.
+    """
+
+    def __init__(self, intervalo=0.1):
+        self.intervalo = intervalo
+        self.pico_bytes = 0
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._laco, name="memoria", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._parar.set()
+        self._thread.join()
+
+    def _laco(self):
+        while not self._parar.is_set():
+            self.pico_bytes = max(self.pico_bytes, rss_arvore(os.getpid()))
+            self._parar.wait(self.intervalo)
+
+
+def rss_arvore(raiz):
+    """RSS (bytes) de `raiz` + descendentes; 0 se o /proc não estiver disponível."""
+    filhos = {}
+    try:
+        pids = [int(p) for p in os.listdir("/proc") if p.isdigit()]
+    except OSError:
+        return 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat", "r") as f:
+                # o nome do processo pode ter espaços; o ppid vem logo depois do ")"
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            filhos.setdefault(ppid, []).append(pid)
+        except (OSError, ValueError, IndexError):
+            continue
+
+    total, pendentes = 0, [raiz]
+    while pendentes:
+        pid = pendentes.pop()
+        pendentes.extend(filhos.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/status", "r") as f:
+                for linha in f:
+                    if linha.startswith("VmRSS:"):
+                        total += int(linha.split()[1]) * 1024
+                        break
+        except OSError:
+            continue
+    return total
+
+
+def _percentil(valores, p):
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    k = (len(ordenados) - 1) * p / 100
+    i = int(k)
+    j = min(i + 1, len(ordenados) - 1)
+    return ordenados[i] + (ordenados[j] - ordenados[i]) * (k - i)
+
+
+def _medir(tarefa, usuario):
+    inicio = time.perf_counter()
+    try:
+        tarefa(usuario)
+        return time.perf_counter() - inicio, None
+    except Exception as e:
+        return time.perf_counter() - inicio, str(e)
+
+
+def registros_mock(base_url):
+    """Total de marcações que o mock realmente aceitou (GET /stats), ou None se não respondeu."""
+    try:
+        with urllib.request.urlopen(f"{base_url}/stats", timeout=5) as resposta:
+            return json.load(resposta)["registros"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def rodar_cenario(nome, execucoes, concorrencia, executar, contar_registros=None):
+    """
+    Executa `execucoes` registros (`executar(usuario)`), com até `concorrencia`
+    simultâneos, e devolve latências p50/p95, vazão e pico de memória.
+    Com `contar_registros`, confere o número de sucessos com as marcações que o
+    servidor de fato recebeu: sucesso sem marcação vira "falsos_sucessos".
+    """
+    resultados = []
+    antes = contar_registros() if contar_registros else None
+    with AmostradorMemoria() as memoria:
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concorrencia) as pool:
+            futuros = [pool.submit(_medir, executar, f"bench-{i % max(concorrencia, 1)}") for i in range(execucoes)]
+            wait(futuros)
+        total = time.perf_counter() - inicio
+        resultados = [f.result() for f in futuros]
+
+    latencias = [d for d, erro in resultados if erro is None]
+    erros = [erro for _, erro in resultados if erro is not None]
+    depois = contar_registros() if contar_registros else None
+    registrados = depois - antes if antes is not None and depois is not None else None
+    return {
+        "cenario": nome,
+        "execucoes": execucoes,
+        "concorrencia": concorrencia,
+        "sucesso": len(latencias),
+        "falha": len(erros),
+        "p50_s": round(_percentil(latencias, 50), 3) if latencias else None,
+        "p95_s": round(_percentil(latencias, 95), 3) if latencias else None,
+        "media_s": round(statistics.mean(latencias), 3) if latencias else None,
+        "total_s": round(total, 3),
+        "vazao_por_min": round(len(latencias) / total * 60, 2) if total else None,
+        "pico_memoria_mb": round(memoria.pico_bytes / 1024 / 1024, 1),
+        "registros_mock": registrados,
+        "falsos_sucessos": max(len(latencias) - registrados, 0) if registrados is not None else None,
+        "erros": sorted(set(erros))[:5],
+    }
+
+
+def _imprimir(r):
+    print(
+        f"{r['cenario']:<22} n={r['execucoes']:<4} conc={r['concorrencia']:<3} "
+        f"ok={r['sucesso']:<4} falha={r['falha']:<3} p50={r['p50_s']}s p95={r['p95_s']}s "
+        f"vazão={r['vazao_por_min']}/min pico={r['pico_memoria_mb']}MB"
+    )
+    if r["falsos_sucessos"]:
+        print(f"    ATENÇÃO: {r['falsos_sucessos']} sucesso(s) sem marcação no mock (registros={r['registros_mock']})")
+    for erro in r["erros"]:
+        print(f"    erro: {erro}")
+
+
+def main():
+    parser = argumentos_mock(argparse.ArgumentParser(
+        description="Benchmark ponta a ponta do registrar_ponto() contra o mock local do Senior X."
+    ))
+    parser.add_argument("-n", "--execucoes", type=int, default=10)
+    parser.add_argument("-c", "--concorrencia", type=int, default=4)
+    parser.add_argument("--base-url", help="usa um mock já rodando em vez de subir um novo")
+    parser.add_argument("--sem-cache", action="store_true", help="desliga o cache de sessão (login em toda execução)")
+    parser.add_argument("--frio", action="store_true", help="inclui cenário com Chromium lançado a cada execução")
+    parser.add_argument("--json", metavar="ARQUIVO", help="grava o relatório em JSON")
+    args = parser.parse_args()
+
+    servidor = None
+    if args.base_url:
+        base_url = args.base_url.rstrip("/")
+    else:
+        servidor = iniciar_mock(**config_mock(args))
+        base_url = servidor.base_url
+
+    # o script lê a configuração na importação: precisa estar no ambiente antes
+    os.environ["SENIOR_BASE_URL"] = base_url
+    os.environ.setdefault("SENIOR_USER", "bench")
+    os.environ.setdefault("SENIOR_PASSWORD", "bench")
+    os.environ["SESSION_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench-sessoes-")
+    if args.sem_cache:
+        os.environ["SESSION_CACHE_TTL"] = "0"
+    os.environ["BATCH_CONCURRENCY"] = str(args.concorrencia)
+
+    import script
+    from navegador import GerenciadorNavegador
+
+    def executar_frio(usuario):
+        script.registrar_ponto(usuario=usuario, senha="bench")
+
+    relatorio = {"base_url": base_url, "cenarios": []}
+    gerenciador = GerenciadorNavegador(max_concorrencia=args.concorrencia)
+    try:
+        gerenciador.iniciar().result()
+
+        def executar_quente(usuario):
+            gerenciador.submeter(lambda b: script.registrar_ponto_async(b, usuario=usuario, senha="bench")).result()
+
+        def contar():
+            return registros_mock(base_url)
+
+        if args.frio:
+            relatorio["cenarios"].append(rodar_cenario("serial (frio)", args.execucoes, 1, executar_frio, contar))
+        relatorio["cenarios"].append(rodar_cenario("serial (quente)", args.execucoes, 1, executar_quente, contar))
+        relatorio["cenarios"].append(
+            rodar_cenario("concorrente (quente)", args.execucoes, args.concorrencia, executar_quente, contar)
+        )
+    finally:
+        gerenciador.parar()
+        if servidor is not None:
+            relatorio["mock"] = dict(servidor.estatisticas)
+            servidor.shutdown()
+
+    for r in relatorio["cenarios"]:
+        _imprimir(r)
+    if "mock" in relatorio:
+        print(f"Mock: {relatorio['mock']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import os
+import re
+from functools import lru_cache
+
+# Hosts de telemetria/ruído que mantêm a rede ocupada (bloqueados em todos os perfis).
+# Casam só no hostname, no começo de um rótulo (ex.: cdn.segment.com, não /segmentos/).
+HOSTS_RUIDO = ["google-analytics", "googletagmanager", "segment", "hotjar", "doubleclick", "facebook", "sentry"]
+
+EXT_IMAGEM = ["png", "jpe?g", "gif", "webp", "avif", "svg", "ico", "bmp"]
+EXT_FONTE = ["woff2?", "ttf", "otf", "eot"]
+EXT_MIDIA = ["mp4", "webm", "ogg", "mp3", "wav", "m4a"]
+EXT_ESTILO = ["css"]
+
+# Perfis de bloqueio (BLOCK_PROFILE). Nenhum deles bloqueia scripts/XHR,
+# que são o que a SPA do ponto precisa para montar o botão.
+PERFIS = {
+    "minimo": {"hosts": HOSTS_RUIDO, "extensoes": []},
+    "leve": {"hosts": HOSTS_RUIDO, "extensoes": EXT_IMAGEM + EXT_FONTE + EXT_MIDIA},
+    "agressivo": {"hosts": HOSTS_RUIDO, "extensoes": EXT_IMAGEM + EXT_FONTE + EXT_MIDIA + EXT_ESTILO},
+}
+
+BLOQUEIO_PERFIL = os.environ.get("BLOCK_PROFILE", "leve")
+BLOQUEIO_HOSTS_EXTRA = [h.strip() for h in os.environ.get("BLOCK_EXTRA_HOSTS", "").split(",") if h.strip()]
+
+
+@lru_cache(maxsize=None)
+def compilar_perfil(nome):
+    """
+    Junta hosts e extensões do perfil numa única regex. Passada ao context.route(),
+    o filtro roda no próprio driver do Playwright: só as requisições bloqueadas
+    chegam ao Python, o resto segue sem ida e volta.
+    """
+    if nome not in PERFIS:
+        raise ValueError(f"Perfil de bloqueio desconhecido: {nome} (use {', '.join(PERFIS)}).")
+
+    perfil = PERFIS[nome]
+    hosts = "|".join(re.escape(h) for h in perfil["hosts"] + BLOQUEIO_HOSTS_EXTRA)
+    # esquema, rótulos anteriores do host e o nome inteiro de um rótulo (ou domínio): nunca o caminho
+    partes = [r"^[a-z][a-z0-9+.-]*://(?:[^/?#@]*@)?(?:[^/?#]*\.)?(?:" + hosts + r")(?=[.:/?#-]|$)"]
+    if perfil["extensoes"]:
+        # extensão no fim do caminho: ?file=x.png na query não conta
+        partes.append(r"^[^?#]*\.(?:" + "|".join(perfil["extensoes"]) + r")(?:[?#]|$)")
+    return re.compile("|".join(partes), re.I)
+
+
+class ContadorRede:
+    """
+    Requisições permitidas vs. bloqueadas em uma execução. Os bytes são
+    aproximados: só somam o content-length das permitidas (chunked conta 0)
+    e não há bytes para as bloqueadas, abortadas antes de baixar.
+    """
+
+    def __init__(self):
+        self.permitidas = 0
+        self.permitidos_bytes = 0
+        self.bloqueadas = 0
+        self.bloqueadas_por_tipo = {}
+
+    def _ao_responder(self, response):
+        # content-length vem no próprio evento (sem ida e volta ao navegador);
+        # respostas chunked/sem cabeçalho contam 0 bytes
+        self.permitidas += 1
+        try:
+            self.permitidos_bytes += int(response.headers.get("content-length") or 0)
+        except ValueError:
+            pass
+
+    async def _ao_bloquear(self, route):
+        tipo = route.request.resource_type
+        self.bloqueadas += 1
+        self.bloqueadas_por_tipo[tipo] = self.bloqueadas_por_tipo.get(tipo, 0) + 1
+        await route.abort()
+
+    def resumo(self):
+        return {
+            "permitidas": self.permitidas,
+            "permitidos_bytes": self.permitidos_bytes,
+            "bloqueadas": self.bloqueadas,
+            "bloqueadas_por_tipo": dict(self.bloqueadas_por_tipo),
+        }
+
+    def resumo_texto(self):
+        return (
+            f"Rede: {self.permitidas} requisições permitidas (~{self.permitidos_bytes / 1024:.0f} KiB, "
+            f"aprox. pelo content-length), "
+            f"{self.bloqueadas} bloqueadas {self.bloqueadas_por_tipo or ''}".rstrip() + "."
+        )
+
+
+async def aplicar_bloqueio(context, contador, perfil=BLOQUEIO_PERFIL):
+    """Instala o perfil de bloqueio no contexto e liga os contadores."""
+    context.on("response", contador._ao_responder)
+    await context.route(compilar_perfil(perfil), contador._ao_bloquear)
@@ -0,0 +1,104 @@
+import asyncio
+import json
+import time
+from collections import namedtuple
+from playwright.async_api import Error as PWError, TimeoutError as PWTimeout
+
+# Condições avaliadas dentro da página (expressões JS booleanas)
+# (só o caminho: a URL do login traz "senior-x" no redirectTo da query)
+URL_LOGIN = "location.pathname.toLowerCase().includes('/login')"
+URL_SENIOR_X = f"location.pathname.toLowerCase().startsWith('/senior-x') && !({URL_LOGIN})"
+TEM_IFRAME = "!!document.querySelector('#custom_iframe')"
+
+ResultadoEspera = namedtuple("ResultadoEspera", ["condicao", "duracao_s"])
+
+
+def _funcao_corrida(condicoes):
+    # Uma única função JS que devolve o nome da primeira condição verdadeira;
+    # o Playwright reavalia a cada frame (raf) sem ida e volta ao Python.
+    testes = " ".join(
+        f"try {{ if ({expr}) return {json.dumps(nome)}; }} catch (e) {{}}"
+        for nome, expr in condicoes.items()
+    )
+    return f"() => {{ {testes} return null; }}"
+
+
+async def aguardar_primeira(page, condicoes, timeout):
+    """
+    Espera até que qualquer uma das `condicoes` ({nome: expressão JS}) seja
+    verdadeira na página. Devolve ResultadoEspera com o nome da vencedora
+    (ou None se estourou o timeout, em ms) e o tempo gasto.
+    """
+    inicio = time.perf_counter()
+    funcao = _funcao_corrida(condicoes)
+    prazo = inicio + timeout / 1000
+
+    while True:
+        restante_ms = int((prazo - time.perf_counter()) * 1000)
+        if restante_ms <= 0:
+            return ResultadoEspera(None, round(time.perf_counter() - inicio, 3))
+        try:
+            handle = await page.wait_for_function(funcao, polling="raf", timeout=restante_ms)
+            return ResultadoEspera(await handle.json_value(), round(time.perf_counter() - inicio, 3))
+        except PWTimeout:
+            return ResultadoEspera(None, round(time.perf_counter() - inicio, 3))
+        except PWError:
+            # contexto destruído por navegação no meio da espera: tenta de novo
+            if page.is_closed():
+                return ResultadoEspera(None, round(time.perf_counter() - inicio, 3))
+            await asyncio.sleep(0.1)
+
+
+async def aguardar_pos_login(context, page, condicoes, timeout):
+    """
+    Igual a aguardar_primeira, mas acompanha abas novas abertas pelo login
+    (evento "page" do contexto): cada aba nova entra na corrida assim que abre,
+    sem parar de avaliar as que já estavam abertas (inclusive a original).
+    Devolve (página vencedora, ResultadoEspera).
+    """
+    abas = asyncio.Queue()
+    ao_abrir = abas.put_nowait
+    context.on("page", ao_abrir)
+    inicio = time.perf_counter()
+    prazo = inicio + timeout / 1000
+    esperas = {}  # task da espera -> página
+    nova_aba = None
+    ultima = page
+
+    def vigiar(p):
+        restante_ms = max(1, int((prazo - time.perf_counter()) * 1000))
+        esperas[asyncio.ensure_future(aguardar_primeira(p, condicoes, restante_ms))] = p
+
+    vigiar(page)
+    try:
+        while True:
+            restante = prazo - time.perf_counter()
+            if restante <= 0 and not esperas:
+                # nenhuma venceu: fica com a aba mais nova, ou a original se ela já fechou
+                aba = page if ultima.is_closed() else ultima
+                return aba, ResultadoEspera(None, round(time.perf_counter() - inicio, 3))
+
+            if nova_aba is None:
+                nova_aba = asyncio.ensure_future(abas.get())
+            # sem abas vivas, só resta esperar uma aba nova até o prazo
+            prontas, _ = await asyncio.wait(
+                set(esperas) | {nova_aba}, timeout=None if esperas else max(restante, 0),
+                return_when=asyncio.FIRST_COMPLETED
+            )
+
+            if nova_aba in prontas:
+                ultima = nova_aba.result()
+                nova_aba = None
+                vigiar(ultima)
+
+            for tarefa in prontas & set(esperas):
+                aba = esperas.pop(tarefa)
+                resultado = tarefa.result()
+                if resultado.condicao:
+                    return aba, ResultadoEspera(resultado.condicao, round(time.perf_counter() - inicio, 3))
+    finally:
+        for tarefa in esperas:
+            tarefa.cancel()
+        if nova_aba is not None:
+            nova_aba.cancel()
+        context.remove_listener("page", ao_abrir)
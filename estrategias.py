@@ -0,0 +1,42 @@
+import json
+import os
+import threading
+
+# Lembra, entre execuções, qual estratégia de seletor funcionou por último,
+# para que ela seja a primeira a ser testada na próxima vez.
+ESTRATEGIAS_FILE = os.environ.get("STRATEGY_CACHE_FILE", ".estrategias.json")
+
+_lock = threading.Lock()
+
+
+def _ler():
+    try:
+        with open(ESTRATEGIAS_FILE, "r", encoding="utf-8") as f:
+            dados = json.load(f)
+        return dados if isinstance(dados, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def ordenar(chave, nomes):
+    """Devolve `nomes` com a última estratégia vencedora de `chave` na frente."""
+    with _lock:
+        preferida = _ler().get(chave)
+    if preferida in nomes:
+        return [preferida] + [n for n in nomes if n != preferida]
+    return list(nomes)
+
+
+def lembrar(chave, nome):
+    with _lock:
+        dados = _ler()
+        if dados.get(chave) == nome:
+            return
+        dados[chave] = nome
+        tmp = ESTRATEGIAS_FILE + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(dados, f)
+            os.replace(tmp, ESTRATEGIAS_FILE)
+        except OSError:
+            pass
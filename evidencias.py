@@ -0,0 +1,93 @@
+import gzip
+import os
+import secrets
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# "falha" (padrão): só quando a execução falha; "sempre"; "nunca"
+EVIDENCIA_MODO = os.environ.get("EVIDENCE_MODE", "falha")
+EVIDENCIA_DIR = os.environ.get("EVIDENCE_DIR", "evidencias")
+EVIDENCIA_MAX_EXECUCOES = int(os.environ.get("EVIDENCE_MAX_RUNS", "50"))
+EVIDENCIA_MAX_DIAS = float(os.environ.get("EVIDENCE_MAX_DAYS", "7"))
+EVIDENCIA_QUALIDADE_JPEG = int(os.environ.get("EVIDENCE_JPEG_QUALITY", "60"))
+
+# Uma thread só: compressão, escrita e limpeza saem do caminho crítico e não disputam disco
+_gravador = ThreadPoolExecutor(max_workers=1, thread_name_prefix="evidencias")
+_pendentes = set()
+
+
+def novo_id():
+    return f"{datetime.now():%Y%m%d-%H%M%S}-{secrets.token_hex(3)}"
+
+
+def deve_capturar(falhou, pedido=None):
+    """`pedido` (True/False) vem da chamada e tem prioridade sobre EVIDENCE_MODE."""
+    if pedido is not None:
+        return pedido
+    if EVIDENCIA_MODO == "sempre":
+        return True
+    if EVIDENCIA_MODO == "nunca":
+        return False
+    return falhou
+
+
+async def capturar(page, execucao_id, log):
+    """
+    Tira screenshot (JPEG) e HTML da página agora — isso precisa do navegador —
+    e deixa compressão/gravação para a thread de evidências. Devolve a pasta destino.
+    """
+    destino = os.path.join(EVIDENCIA_DIR, execucao_id)
+    imagem = html = None
+    try:
+        imagem = await page.screenshot(type="jpeg", quality=EVIDENCIA_QUALIDADE_JPEG, full_page=True)
+    except Exception as e:
+        log.append(f"Não foi possível tirar o screenshot: {e}")
+    try:
+        html = await page.content()
+    except Exception as e:
+        log.append(f"Não foi possível salvar o HTML: {e}")
+
+    if imagem is None and html is None:
+        return None
+
+    futuro = _gravador.submit(_gravar, destino, imagem, html)
+    _pendentes.add(futuro)
+    futuro.add_done_callback(_pendentes.discard)
+    log.append(f"Evidências enviadas para {destino}/ (gravação em segundo plano).")
+    return destino
+
+
+def aguardar_gravacoes(timeout=None):
+    """Espera as gravações pendentes (útil antes de encerrar o processo, ex.: no Actions)."""
+    for futuro in list(_pendentes):
+        try:
+            futuro.result(timeout=timeout)
+        except Exception:
+            pass
+
+
+def _gravar(destino, imagem, html):
+    os.makedirs(destino, exist_ok=True)
+    if imagem is not None:
+        with open(os.path.join(destino, "ponto.jpg"), "wb") as f:
+            f.write(imagem)
+    if html is not None:
+        with gzip.open(os.path.join(destino, "ponto.html.gz"), "wt", encoding="utf-8") as f:
+            f.write(html)
+    _limpar()
+
+
+def _limpar():
+    """Retenção: remove execuções mais antigas que EVIDENCE_MAX_DAYS ou além de EVIDENCE_MAX_RUNS."""
+    try:
+        pastas = [os.path.join(EVIDENCIA_DIR, n) for n in os.listdir(EVIDENCIA_DIR)]
+    except OSError:
+        return
+    pastas = sorted((p for p in pastas if os.path.isdir(p)), key=os.path.getmtime, reverse=True)
+
+    limite = time.time() - EVIDENCIA_MAX_DIAS * 86400
+    for i, pasta in enumerate(pastas):
+        if i >= EVIDENCIA_MAX_EXECUCOES or os.path.getmtime(pasta) < limite:
+            shutil.rmtree(pasta, ignore_errors=True)
@@ -0,0 +1,177 @@
+import asyncio
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+JOB_HISTORY_MAX = int(os.environ.get("JOB_HISTORY_MAX", "200"))
+JOB_DEDUP_WINDOW = int(os.environ.get("JOB_DEDUP_WINDOW", "120"))
+
+# Estados de um job
+NA_FILA = "queued"
+RODANDO = "running"
+SUCESSO = "success"
+ERRO = "error"
+
+
+class _HistoricoJobs:
+    """
+    Histórico e deduplicação dos jobs, sem decidir onde eles rodam.
+
+    enfileirar() devolve o job na hora e entrega a tarefa para _despachar()
+    da subclasse. Pedidos repetidos para a mesma chave (usuário) dentro de
+    `janela_dedup_s` reaproveitam o job existente, a menos que ele tenha falhado.
+    O histórico guarda até `historico_max` jobs; os finalizados mais antigos saem primeiro.
+    """
+
+    def __init__(self, historico_max=JOB_HISTORY_MAX, janela_dedup_s=JOB_DEDUP_WINDOW):
+        self._historico_max = max(1, historico_max)
+        self._janela_dedup_s = janela_dedup_s
+        self._jobs = OrderedDict()
+        self._ultimo_por_chave = {}
+        self._lock = threading.Lock()
+
+    def enfileirar(self, chave, tarefa):
+        """
+        Agenda tarefa(log, job_id) e devolve (job, deduplicado). `log` é uma lista
+        que a tarefa vai preenchendo, para o GET /jobs/<id> mostrar o andamento;
+        `job_id` identifica a execução (ex.: pasta das evidências).
+        """
+        agora = time.time()
+        with self._lock:
+            existente = self._jobs.get(self._ultimo_por_chave.get(chave))
+            if (existente is not None
+                    and existente["state"] != ERRO
+                    and agora - existente["created_at"] < self._janela_dedup_s):
+                existente["merged_requests"] += 1
+                return self._publico(existente), True
+
+            job = {
+                "id": uuid.uuid4().hex,
+                "key": chave,
+                "state": NA_FILA,
+                "created_at": agora,
+                "started_at": None,
+                "finished_at": None,
+                "merged_requests": 0,
+                "error": None,
+                "_log": [],
+            }
+            self._jobs[job["id"]] = job
+            self._ultimo_por_chave[chave] = job["id"]
+            self._despejar()
+
+        self._despachar(job, tarefa)
+        return self._publico(job), False
+
+    def obter(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._publico(job) if job is not None else None
+
+    def resumo(self):
+        with self._lock:
+            estados = [j["state"] for j in self._jobs.values()]
+        return {
+            "queued": estados.count(NA_FILA),
+            "running": estados.count(RODANDO),
+            "history": len(estados),
+        }
+
+    def _despachar(self, job, tarefa):
+        raise NotImplementedError
+
+    def _marcar_inicio(self, job):
+        with self._lock:
+            job["state"] = RODANDO
+            job["started_at"] = time.time()
+
+    def _marcar_fim(self, job, erro):
+        with self._lock:
+            job["state"] = SUCESSO if erro is None else ERRO
+            job["error"] = erro
+            job["finished_at"] = time.time()
+
+    def _despejar(self):
+        # só remove jobs finalizados; queued/running nunca saem do histórico
+        excesso = len(self._jobs) - self._historico_max
+        if excesso <= 0:
+            return
+        for job_id in [i for i, j in self._jobs.items() if j["state"] in (SUCESSO, ERRO)][:excesso]:
+            job = self._jobs.pop(job_id)
+            if self._ultimo_por_chave.get(job["key"]) == job_id:
+                del self._ultimo_por_chave[job["key"]]
+
+    @staticmethod
+    def _publico(job):
+        criado, inicio, fim = job["created_at"], job["started_at"], job["finished_at"]
+        return {
+            "id": job["id"],
+            "state": job["state"],
+            "merged_requests": job["merged_requests"],
+            "created_at": criado,
+            "started_at": inicio,
+            "finished_at": fim,
+            "timings": {
+                "queue_s": round((inicio or time.time()) - criado, 3),
+                "run_s": round((fim or time.time()) - inicio, 3) if inicio else None,
+            },
+            "log": "\n".join(job["_log"]),
+            "error": job["error"],
+        }
+
+
+class FilaExecucoes(_HistoricoJobs):
+    """Fila em memória de execuções do registro de ponto: um pool de threads roda os jobs em segundo plano."""
+
+    def __init__(self, max_trabalhadores=JOB_WORKERS, historico_max=JOB_HISTORY_MAX,
+                 janela_dedup_s=JOB_DEDUP_WINDOW):
+        super().__init__(historico_max, janela_dedup_s)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_trabalhadores), thread_name_prefix="job")
+
+    def parar(self):
+        self._executor.shutdown(wait=True)
+
+    def _despachar(self, job, tarefa):
+        self._executor.submit(self._rodar, job, tarefa)
+
+    def _rodar(self, job, tarefa):
+        self._marcar_inicio(job)
+        try:
+            tarefa(job["_log"], job["id"])
+            erro = None
+        except Exception as e:
+            erro = str(e)
+        self._marcar_fim(job, erro)
+
+
+class FilaExecucoesAsync(_HistoricoJobs):
+    """
+    Mesma fila (histórico, dedup, formato dos jobs) para o servidor ASGI:
+    tarefa(log, job_id) é uma corrotina e vira uma task no event loop que chamou
+    enfileirar(). Quem limita a concorrência é o NavegadorAsync.
+    """
+
+    def __init__(self, historico_max=JOB_HISTORY_MAX, janela_dedup_s=JOB_DEDUP_WINDOW):
+        super().__init__(historico_max, janela_dedup_s)
+        self._tarefas = set()
+
+    async def parar(self):
+        await asyncio.gather(*self._tarefas, return_exceptions=True)
+
+    def _despachar(self, job, tarefa):
+        t = asyncio.get_running_loop().create_task(self._rodar_async(job, tarefa))
+        self._tarefas.add(t)
+        t.add_done_callback(self._tarefas.discard)
+
+    async def _rodar_async(self, job, tarefa):
+        self._marcar_inicio(job)
+        try:
+            await tarefa(job["_log"], job["id"])
+            erro = None
+        except Exception as e:
+            erro = str(e)
+        self._marcar_fim(job, erro)
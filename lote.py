@@ -0,0 +1,106 @@
+import asyncio
+import json
+import os
+import sys
+import time
+import evidencias
+import script
+from navegador import GerenciadorNavegador
+
+BATCH_CREDENTIALS_FILE = os.environ.get("BATCH_CREDENTIALS_FILE", "usuarios.json")
+
+
+def carregar_credenciais(caminho=BATCH_CREDENTIALS_FILE):
+    """
+    Lê a lista de credenciais de um JSON no formato:
+    [{"usuario": "...", "senha": "..."}, ...]
+    """
+    with open(caminho, "r", encoding="utf-8") as f:
+        return validar_credenciais(json.load(f))
+
+
+def validar_credenciais(credenciais):
+    if not isinstance(credenciais, list) or not credenciais:
+        raise ValueError("Informe uma lista não vazia de credenciais.")
+
+    validas = []
+    for i, c in enumerate(credenciais):
+        if not isinstance(c, dict) or not c.get("usuario") or not c.get("senha"):
+            raise ValueError(f"Credencial #{i} inválida: informe 'usuario' e 'senha'.")
+        validas.append({"usuario": c["usuario"], "senha": c["senha"]})
+    return validas
+
+
+async def _registrar_usuario(browser, usuario, senha):
+    log = []
+    execucao_id = evidencias.novo_id()
+    inicio = time.perf_counter()
+    try:
+        await script.registrar_ponto_async(browser, usuario=usuario, senha=senha, log=log, execucao_id=execucao_id)
+        status, erro = "success", None
+    except Exception as e:
+        status, erro = "error", str(e)
+
+    relatorio = {
+        "user": usuario,
+        "run_id": execucao_id,
+        "status": status,
+        "duration_s": round(time.perf_counter() - inicio, 3),
+        "log": "\n".join(log)
+    }
+    if erro:
+        relatorio["error"] = erro
+    return relatorio
+
+
+async def registrar_lote_async(navegador, credenciais):
+    """
+    Registra o ponto de vários usuários em paralelo, cada um no seu próprio
+    contexto do mesmo Chromium. A concorrência é limitada pelo NavegadorAsync
+    (BATCH_CONCURRENCY). Devolve o relatório do lote, com chaves em inglês como
+    o resto da API pública, e um item por usuário em "results".
+    """
+    inicio = time.perf_counter()
+    execucoes = await asyncio.gather(*(
+        navegador.executar(lambda browser, c=c: _registrar_usuario(browser, c["usuario"], c["senha"]))
+        for c in credenciais
+    ), return_exceptions=True)
+
+    resultados = []
+    for c, r in zip(credenciais, execucoes):
+        if isinstance(r, Exception):
+            # falha antes de chegar no fluxo (ex.: Chromium não lançou)
+            resultados.append({"user": c["usuario"], "run_id": None, "status": "error", "duration_s": None, "log": "",
+                               "error": str(r)})
+        else:
+            resultados.append(r)
+
+    return {
+        "total": len(resultados),
+        "succeeded": sum(1 for r in resultados if r["status"] == "success"),
+        "failed": sum(1 for r in resultados if r["status"] != "success"),
+        "concurrency": navegador.max_concorrencia,
+        "duration_s": round(time.perf_counter() - inicio, 3),
+        "results": resultados
+    }
+
+
+def registrar_lote(gerenciador, credenciais):
+    """Versão síncrona (app.py/CLI): roda o registrar_lote_async no loop do GerenciadorNavegador."""
+    return gerenciador.aguardar(registrar_lote_async(gerenciador.assincrono, credenciais))
+
+
+if __name__ == "__main__":
+    caminho = sys.argv[1] if len(sys.argv) > 1 else BATCH_CREDENTIALS_FILE
+    gerenciador = GerenciadorNavegador()
+    try:
+        relatorio = registrar_lote(gerenciador, carregar_credenciais(caminho))
+    finally:
+        gerenciador.parar()
+
+    for r in relatorio["results"]:
+        print(f"[{r['status']}] {r['user']} ({r['duration_s']}s)" + (f": {r['error']}" if "error" in r else ""))
+    print(f"Total: {relatorio['total']} | Sucesso: {relatorio['succeeded']} | Falha: {relatorio['failed']} | "
+          f"{relatorio['duration_s']}s")
+    if relatorio["failed"]:
+        sys.exit(1)
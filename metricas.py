@@ -0,0 +1,147 @@
+import os
+import threading
+import time
+
+# Limites (em segundos) dos buckets dos histogramas de fase
+BUCKETS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120]
+
+
+class Histograma:
+    """Histograma no formato do Prometheus, com um rótulo (ex.: fase)."""
+
+    def __init__(self, nome, ajuda, rotulo, buckets=BUCKETS):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulo = rotulo
+        self.buckets = list(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor_rotulo, valor):
+        with self._lock:
+            serie = self._series.setdefault(valor_rotulo, {"buckets": [0] * len(self.buckets), "soma": 0.0, "total": 0})
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    serie["buckets"][i] += 1
+            serie["soma"] += valor
+            serie["total"] += 1
+
+    def renderizar(self):
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} histogram"]
+        with self._lock:
+            for valor_rotulo, serie in sorted(self._series.items()):
+                rot = f'{self.rotulo}="{valor_rotulo}"'
+                for limite, qtd in zip(self.buckets, serie["buckets"]):
+                    linhas.append(f'{self.nome}_bucket{{{rot},le="{limite}"}} {qtd}')
+                linhas.append(f'{self.nome}_bucket{{{rot},le="+Inf"}} {serie["total"]}')
+                linhas.append(f"{self.nome}_sum{{{rot}}} {serie['soma']:.6f}")
+                linhas.append(f"{self.nome}_count{{{rot}}} {serie['total']}")
+        return "\n".join(linhas)
+
+
+class Contador:
+    """Contador no formato do Prometheus, com rótulos livres."""
+
+    def __init__(self, nome, ajuda, rotulos):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = rotulos
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, *valores):
+        with self._lock:
+            self._valores[valores] = self._valores.get(valores, 0) + 1
+
+    def renderizar(self):
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} counter"]
+        with self._lock:
+            for valores, qtd in sorted(self._valores.items()):
+                rot = ",".join(f'{r}="{v}"' for r, v in zip(self.rotulos, valores))
+                linhas.append(f"{self.nome}{{{rot}}} {qtd}")
+        return "\n".join(linhas)
+
+
+FASES = Histograma("ponto_fase_duracao_segundos", "Duração de cada fase do registro de ponto.", "fase")
+ESTRATEGIAS = Contador("ponto_seletor_total", "Resultado do clique por estratégia de seletor.", ["estrategia", "resultado"])
+EXECUCOES = Contador("ponto_execucoes_total", "Execuções do registro de ponto por resultado.", ["resultado"])
+
+REGISTRO = [FASES, ESTRATEGIAS, EXECUCOES]
+
+
+# Marcos do cold start (ex.: "app_importado", "navegador_pronto"), em segundos desde o início do processo
+INICIO = {}
+
+
+def _inicio_processo():
+    """Epoch em que este processo começou, lido do /proc (Linux); None fora dele."""
+    try:
+        with open("/proc/self/stat", "r") as f:
+            # o nome do processo pode ter espaços; starttime (em ticks desde o boot) é o 20º campo depois do ")"
+            ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        idade = time.clock_gettime(time.CLOCK_BOOTTIME) - ticks / os.sysconf("SC_CLK_TCK")
+        return time.time() - idade
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+# Sem /proc, conta a partir da importação deste módulo (perde só o boot do interpretador)
+INICIO_PROCESSO = _inicio_processo() or time.time()
+
+
+def marcar_inicio(marco):
+    """Registra (uma vez só) quanto tempo o processo levou até `marco`."""
+    INICIO.setdefault(marco, round(time.time() - INICIO_PROCESSO, 3))
+
+
+def gauge(nome, ajuda, valor):
+    """Linhas de um gauge avulso (valores lidos na hora, ex.: saúde do navegador)."""
+    return f"# HELP {nome} {ajuda}\n# TYPE {nome} gauge\n{nome} {valor}"
+
+
+def renderizar(extras=()):
+    """Texto completo para o endpoint /metrics."""
+    partes = [m.renderizar() for m in REGISTRO]
+    if INICIO:
+        linhas = [
+            "# HELP ponto_inicio_segundos Segundos desde o início do processo até cada marco do boot.",
+            "# TYPE ponto_inicio_segundos gauge",
+        ]
+        linhas += [f'ponto_inicio_segundos{{marco="{m}"}} {v}' for m, v in sorted(INICIO.items())]
+        partes.append("\n".join(linhas))
+    return "\n".join(partes + list(extras)) + "\n"
+
+
+class Rastreio:
+    """
+    Spans sequenciais de uma execução: fase("x") encerra a fase anterior e abre
+    a próxima; encerrar() fecha a atual. Cada fase concluída é observada no histograma.
+    """
+
+    def __init__(self):
+        self.fases = []
+        self._atual = None
+
+    def fase(self, nome):
+        self.encerrar()
+        self._atual = (nome, time.perf_counter())
+
+    def encerrar(self):
+        if self._atual is None:
+            return
+        nome, inicio = self._atual
+        self._atual = None
+        duracao = time.perf_counter() - inicio
+        self.fases.append((nome, round(duracao, 3)))
+        FASES.observar(nome, duracao)
+
+    def resumo(self):
+        total = {}
+        for nome, duracao in self.fases:
+            total[nome] = round(total.get(nome, 0) + duracao, 3)
+        return total
+
+    def resumo_texto(self):
+        if not self.fases:
+            return "Tempos por fase: nenhuma fase concluída."
+        return "Tempos por fase: " + " | ".join(f"{nome} {d:.2f}s" for nome, d in self.fases)
@@ -0,0 +1,315 @@
+import argparse
+import json
+import random
+import secrets
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, urlparse
+
+# Latências padrão (ms) de cada etapa simulada
+LATENCIAS_PADRAO = {
+    "pagina": 150,      # HTML de login / shell do Senior-X / página do iframe
+    "login": 400,       # autenticação
+    "iframe": 600,      # shell do Senior-X montando o #custom_iframe
+    "botao": 500,       # SPA do ponto renderizando o botão
+    "api": 300,         # POST da marcação
+    "estatico": 50,     # imagens/css
+}
+
+# Modos de falha aceitos em --falha
+FALHAS = ["sem_iframe", "sem_botao", "sem_toast", "erro_api", "credenciais"]
+
+COOKIE = "mock_sessao"
+
+PAGINA_LOGIN = """<!doctype html>
+<html lang="pt-BR"><head><meta charset="utf-8"><title>Senior X - Login</title>
+<link rel="stylesheet" href="/static/app.css"></head>
+<body>
+<img src="/static/logo.png" alt="Senior">
+<form onsubmit="return false">
+  <input id="usuario" placeholder="Usuário">
+  <button id="proximo" type="button">Próximo</button>
+  <div id="etapa-senha" style="display:none">
+    <input id="senha" type="password" placeholder="Senha">
+    <button id="entrar" type="button">Entrar</button>
+  </div>
+  <p id="erro"></p>
+</form>
+<script>
+document.getElementById('proximo').onclick = () => {
+  document.getElementById('proximo').style.display = 'none';
+  document.getElementById('etapa-senha').style.display = 'block';
+};
+document.getElementById('entrar').onclick = async () => {
+  const r = await fetch('/login/autenticar', {
+    method: 'POST',
+    headers: {'Content-Type': 'application/json'},
+    body: JSON.stringify({
+      usuario: document.getElementById('usuario').value,
+      senha: document.getElementById('senha').value
+    })
+  });
+  if (!r.ok) { document.getElementById('erro').textContent = 'Usuário ou senha inválidos'; return; }
+  const dados = await r.json();
+  localStorage.setItem('token', dados.token);
+  const destino = new URLSearchParams(location.search).get('redirectTo');
+  location.href = destino || '/senior-x/';
+};
+</script>
+</body></html>
+"""
+
+PAGINA_SENIOR_X = """<!doctype html>
+<html lang="pt-BR"><head><meta charset="utf-8"><title>Senior X</title></head>
+<body>
+<div id="app">Senior X</div>
+<script>
+function abrirTela() {
+  const hash = location.hash;
+  if (!hash.includes('clockingEvent') || __SEM_IFRAME__) return;
+  const link = new URLSearchParams(hash.split('?')[1] || '').get('link');
+  setTimeout(() => {
+    if (document.getElementById('custom_iframe')) return;
+    const f = document.createElement('iframe');
+    f.id = 'custom_iframe';
+    f.src = link;
+    f.style = 'width:100%;height:600px';
+    document.body.appendChild(f);
+  }, __IFRAME_MS__);
+}
+window.addEventListener('hashchange', abrirTela);
+abrirTela();
+</script>
+</body></html>
+"""
+
+PAGINA_PONTO = """<!doctype html>
+<html lang="pt-BR"><head><meta charset="utf-8"><title>Ponto Mobile</title>
+<link rel="stylesheet" href="/static/app.css"></head>
+<body>
+<img src="/static/logo.png" alt="Senior">
+<div id="acoes"></div>
+<div id="toast" role="status"></div>
+<script>
+setTimeout(() => {
+  if (__SEM_BOTAO__) return;
+  const b = document.createElement('button');
+  b.id = 'btn-clocking-event-' + Math.floor(Math.random() * 100000);
+  b.className = 'resize-clocking-event-button';
+  b.textContent = 'Registrar Ponto';
+  b.onclick = async () => {
+    const r = await fetch('/hcm-pontomobile/api/clocking-event', {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        'Authorization': 'Bearer ' + (localStorage.getItem('token') || '')
+      },
+      body: JSON.stringify({clientDateTimeEvent: new Date().toISOString(), origin: 'WEB'})
+    });
+    if (__SEM_TOAST__) return;
+    document.getElementById('toast').textContent =
+      r.ok ? 'Ponto registrado com sucesso' : 'Erro ao registrar o ponto';
+  };
+  document.getElementById('acoes').appendChild(b);
+}, __BOTAO_MS__);
+</script>
+</body></html>
+"""
+
+# ~40 KiB de "imagem" para os perfis de bloqueio terem o que economizar
+LOGO = b"\x89PNG\r\n\x1a\n" + bytes(40 * 1024)
+CSS = b"body{font-family:sans-serif}" * 200
+
+
+class MockSenior(ThreadingHTTPServer):
+    """Servidor HTTP que imita o login, o Senior-X e a tela de ponto."""
+
+    daemon_threads = True
+
+    def __init__(self, endereco, latencias=None, falhas=(), taxa_falha=0.0, sessao_ttl=3600):
+        super().__init__(endereco, _Handler)
+        self.latencias = {**LATENCIAS_PADRAO, **(latencias or {})}
+        self.falhas = set(falhas)
+        self.taxa_falha = taxa_falha
+        self.sessao_ttl = sessao_ttl
+        self.sessoes = {}
+        self.estatisticas = {"logins": 0, "registros": 0, "erros_api": 0, "sessoes_expiradas": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, porta = self.server_address[:2]
+        return f"http://{host}:{porta}"
+
+    def contar(self, chave):
+        with self._lock:
+            self.estatisticas[chave] += 1
+
+    def sessao_valida(self, token):
+        with self._lock:
+            criada = self.sessoes.get(token)
+        if criada is None:
+            return False
+        if time.time() - criada > self.sessao_ttl:
+            self.contar("sessoes_expiradas")
+            return False
+        return True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: MockSenior
+
+    def log_message(self, *args):
+        pass
+
+    def _esperar(self, etapa):
+        time.sleep(self.server.latencias[etapa] / 1000)
+
+    def _responder(self, status, corpo=b"", tipo="text/html; charset=utf-8", cabecalhos=None):
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        for k, v in (cabecalhos or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _token(self):
+        auth = self.headers.get("Authorization", "")
+        if auth.startswith("Bearer ") and auth[7:]:
+            return auth[7:]
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        return cookie[COOKIE].value if COOKIE in cookie else None
+
+    def _redirecionar_login(self):
+        destino = quote(f"{self.server.base_url}/senior-x/", safe="")
+        self._responder(302, cabecalhos={"Location": f"/login/?redirectTo={destino}"})
+
+    def _pagina(self, modelo):
+        srv = self.server
+        html = (modelo
+                .replace("__SEM_IFRAME__", str("sem_iframe" in srv.falhas).lower())
+                .replace("__SEM_BOTAO__", str("sem_botao" in srv.falhas).lower())
+                .replace("__SEM_TOAST__", str("sem_toast" in srv.falhas).lower())
+                .replace("__IFRAME_MS__", str(srv.latencias["iframe"]))
+                .replace("__BOTAO_MS__", str(srv.latencias["botao"])))
+        self._responder(200, html.encode("utf-8"))
+
+    def do_GET(self):
+        caminho = urlparse(self.path).path
+
+        if caminho.startswith("/static/"):
+            self._esperar("estatico")
+            if caminho.endswith(".png"):
+                return self._responder(200, LOGO, "image/png")
+            return self._responder(200, CSS, "text/css")
+
+        if caminho == "/stats":
+            with self.server._lock:
+                corpo = json.dumps(self.server.estatisticas).encode("utf-8")
+            return self._responder(200, corpo, "application/json")
+
+        self._esperar("pagina")
+        if caminho.startswith("/login"):
+            return self._responder(200, PAGINA_LOGIN.encode("utf-8"))
+
+        if caminho.startswith("/senior-x"):
+            if not self.server.sessao_valida(self._token()):
+                return self._redirecionar_login()
+            return self._pagina(PAGINA_SENIOR_X)
+
+        if caminho.startswith("/hcm-pontomobile/hcm/pontomobile"):
+            if not self.server.sessao_valida(self._token()):
+                return self._redirecionar_login()
+            return self._pagina(PAGINA_PONTO)
+
+        self._responder(404, b"not found", "text/plain")
+
+    def do_POST(self):
+        caminho = urlparse(self.path).path
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        corpo = self.rfile.read(tamanho) if tamanho else b""
+
+        if caminho == "/login/autenticar":
+            self._esperar("login")
+            try:
+                dados = json.loads(corpo or b"{}")
+            except ValueError:
+                dados = {}
+            if "credenciais" in self.server.falhas or not dados.get("usuario") or not dados.get("senha"):
+                return self._responder(401, b'{"error":"invalid_credentials"}', "application/json")
+
+            token = secrets.token_hex(16)
+            with self.server._lock:
+                self.server.sessoes[token] = time.time()
+            self.server.contar("logins")
+            return self._responder(
+                200, json.dumps({"token": token}).encode("utf-8"), "application/json",
+                {"Set-Cookie": f"{COOKIE}={token}; Path=/; HttpOnly"}
+            )
+
+        if caminho == "/hcm-pontomobile/api/clocking-event":
+            self._esperar("api")
+            if not self.server.sessao_valida(self._token()):
+                return self._responder(401, b'{"error":"unauthorized"}', "application/json")
+            if "erro_api" in self.server.falhas or random.random() < self.server.taxa_falha:
+                self.server.contar("erros_api")
+                return self._responder(500, b'{"error":"internal"}', "application/json")
+            self.server.contar("registros")
+            return self._responder(200, b'{"status":"ok"}', "application/json")
+
+        self._responder(404, b"not found", "text/plain")
+
+
+def iniciar_mock(porta=0, host="127.0.0.1", **config):
+    """Sobe o mock numa thread em segundo plano e devolve o servidor (use .base_url)."""
+    servidor = MockSenior((host, porta), **config)
+    threading.Thread(target=servidor.serve_forever, name="mock-senior", daemon=True).start()
+    return servidor
+
+
+def _parse_latencias(itens):
+    latencias = {}
+    for item in itens or []:
+        etapa, _, ms = item.partition("=")
+        if etapa not in LATENCIAS_PADRAO or not ms.isdigit():
+            raise argparse.ArgumentTypeError(f"Latência inválida: {item} (etapas: {', '.join(LATENCIAS_PADRAO)})")
+        latencias[etapa] = int(ms)
+    return latencias
+
+
+def argumentos_mock(parser):
+    """Argumentos do mock, reaproveitados pelo benchmark.py."""
+    parser.add_argument("--latencia", action="append", metavar="ETAPA=MS",
+                        help=f"latência de uma etapa ({', '.join(LATENCIAS_PADRAO)}); pode repetir")
+    parser.add_argument("--falha", action="append", choices=FALHAS, default=[],
+                        help="modo de falha a simular; pode repetir")
+    parser.add_argument("--taxa-falha", type=float, default=0.0,
+                        help="probabilidade (0-1) de o POST da marcação responder 500")
+    parser.add_argument("--sessao-ttl", type=int, default=3600,
+                        help="validade das sessões em segundos (para simular sessão expirada)")
+    return parser
+
+
+def config_mock(args):
+    return {
+        "latencias": _parse_latencias(args.latencia),
+        "falhas": args.falha,
+        "taxa_falha": args.taxa_falha,
+        "sessao_ttl": args.sessao_ttl,
+    }
+
+
+if __name__ == "__main__":
+    parser = argumentos_mock(argparse.ArgumentParser(description="Mock local do Senior X para testes e benchmarks."))
+    parser.add_argument("--porta", type=int, default=8765)
+    args = parser.parse_args()
+
+    servidor = MockSenior(("127.0.0.1", args.porta), **config_mock(args))
+    print(f"Mock do Senior X em {servidor.base_url} (use SENIOR_BASE_URL={servidor.base_url})")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,237 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+import metricas
+
+ARGS_CHROMIUM = ["--no-sandbox", "--disable-dev-shm-usage"]
+
+# O Playwright 1.54 já lança o Chromium com --disable-extensions, --disable-background-networking,
+# --disable-component-update, --disable-default-apps, --disable-breakpad, --no-first-run,
+# --metrics-recording-only etc. (e --mute-audio no headless). Aqui só entra o que ele não passa.
+ARGS_CHROMIUM_ENXUTO = ["--disable-gpu", "--disable-sync", "--no-pings"]
+
+# BROWSER_LEAN_ARGS=0 tira essas três; BROWSER_EXTRA_ARGS acrescenta flags (separadas por espaço)
+NAVEGADOR_ENXUTO = os.environ.get("BROWSER_LEAN_ARGS", "1") != "0"
+NAVEGADOR_ARGS_EXTRA = os.environ.get("BROWSER_EXTRA_ARGS", "").split()
+
+# Quantos registros rodam ao mesmo tempo no mesmo Chromium (/run, /batch, agendador)
+LOTE_CONCORRENCIA = int(os.environ.get("BATCH_CONCURRENCY", "4"))
+
+
+class _Vaga:
+    """Vaga do semáforo que a execução corrente ocupa (ou já devolveu)."""
+
+    def __init__(self, semaforo):
+        self.semaforo = semaforo
+        self.ocupada = True
+
+
+_VAGA = contextvars.ContextVar("vaga_navegador", default=None)
+
+
+def liberar_vaga():
+    """
+    Devolve a vaga da execução corrente antes de uma espera ociosa (ex.: o
+    agendador segurando o clique até o alvo), para outro usuário já ir fazendo
+    login. Fora de NavegadorAsync.executar não faz nada.
+    """
+    vaga = _VAGA.get()
+    if vaga is not None and vaga.ocupada:
+        vaga.ocupada = False
+        vaga.semaforo.release()
+
+
+async def retomar_vaga():
+    """Volta a ocupar a vaga devolvida por liberar_vaga() (espera uma, se preciso)."""
+    vaga = _VAGA.get()
+    if vaga is not None and not vaga.ocupada:
+        await vaga.semaforo.acquire()
+        vaga.ocupada = True
+
+
+def lancar_navegador(p):
+    """Lança o Chromium headless com os argumentos padrão do projeto (devolve a corrotina do launch)."""
+    args = ARGS_CHROMIUM + (ARGS_CHROMIUM_ENXUTO if NAVEGADOR_ENXUTO else []) + NAVEGADOR_ARGS_EXTRA
+    return p.chromium.launch(headless=True, args=args)
+
+
+class NavegadorAsync:
+    """
+    Mantém um Chromium aquecido durante toda a vida do processo, no event loop
+    de quem o usa (servidor ASGI ou a thread do GerenciadorNavegador). Cada
+    execução abre só um contexto novo nele; as execuções se intercalam nas
+    esperas de rede/DOM e o semáforo limita quantas trabalham de uma vez (quem
+    só está esperando o horário do clique devolve a vaga com liberar_vaga).
+    Se o Chromium cair, é relançado antes da próxima execução: o evento
+    "disconnected" chega porque o loop está sempre rodando, e is_connected()
+    é conferido de novo em cada execução e no health-check.
+    """
+
+    def __init__(self, max_concorrencia=LOTE_CONCORRENCIA):
+        self.max_concorrencia = max(1, max_concorrencia)
+        self._semaforo = asyncio.Semaphore(self.max_concorrencia)
+        self._lancando = asyncio.Lock()
+        self._playwright = None
+        self._browser = None
+        self._conectado = False
+        self._parando = False
+        self.ativas = 0
+        self._tempos = {
+            "lancamentos": 0,
+            "ultimo_lancamento_s": None,
+            "execucoes": 0,
+            "ultima_execucao_s": None,
+        }
+
+    async def iniciar(self):
+        """Lança o navegador (se ainda não estiver de pé)."""
+        await self._garantir_navegador()
+
+    async def executar(self, tarefa):
+        """
+        Aguarda uma vaga e devolve o resultado de `await tarefa(browser)`.
+        A tarefa pode devolver a vaga durante esperas ociosas (liberar_vaga).
+        """
+        await self._semaforo.acquire()
+        vaga = _Vaga(self._semaforo)
+        token = _VAGA.set(vaga)
+        try:
+            browser = await self._garantir_navegador()
+            self.ativas += 1
+            inicio = time.perf_counter()
+            try:
+                return await tarefa(browser)
+            except Exception:
+                # o Chromium pode ter caído no meio da execução antes de o evento "disconnected" chegar
+                if not browser.is_connected():
+                    self._marcar_desconectado(browser)
+                raise
+            finally:
+                self.ativas -= 1
+                self._tempos["execucoes"] += 1
+                self._tempos["ultima_execucao_s"] = round(time.perf_counter() - inicio, 3)
+        finally:
+            _VAGA.reset(token)
+            if vaga.ocupada:
+                self._semaforo.release()
+
+    def saudavel(self):
+        """True se o Chromium está lançado e conectado."""
+        return self._browser is not None and self._conectado and self._browser.is_connected()
+
+    def tempos(self):
+        return dict(self._tempos)
+
+    async def parar(self):
+        self._parando = True
+        async with self._lancando:
+            if self._browser is not None:
+                try:
+                    await self._browser.close()
+                except Exception:
+                    pass
+                self._browser = None
+            self._conectado = False
+            await self._parar_playwright()
+
+    async def _garantir_navegador(self):
+        async with self._lancando:
+            if self.saudavel():
+                return self._browser
+
+            if self._browser is not None:
+                try:
+                    await self._browser.close()
+                except Exception:
+                    pass
+                self._browser = None
+
+            inicio = time.perf_counter()
+            try:
+                if self._playwright is None:
+                    self._playwright = await _iniciar_playwright()
+                browser = await lancar_navegador(self._playwright)
+            except Exception:
+                # driver do Playwright pode ter morrido junto: recomeça do zero
+                await self._parar_playwright()
+                self._playwright = await _iniciar_playwright()
+                browser = await lancar_navegador(self._playwright)
+
+            browser.on("disconnected", self._marcar_desconectado)
+            self._browser = browser
+            self._conectado = True
+
+            duracao = time.perf_counter() - inicio
+            metricas.FASES.observar("lancamento_navegador", duracao)
+            self._tempos["lancamentos"] += 1
+            self._tempos["ultimo_lancamento_s"] = round(duracao, 3)
+            return browser
+
+    def _marcar_desconectado(self, browser):
+        if browser is not self._browser:
+            return  # evento atrasado de um Chromium que já foi substituído
+        self._conectado = False
+        if not self._parando:
+            # health-check passivo: o Chromium caiu, relança em segundo plano antes da próxima execução
+            relancamento = asyncio.ensure_future(self._garantir_navegador())
+            relancamento.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    async def _parar_playwright(self):
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+
+def _iniciar_playwright():
+    # import tardio: quem só importa este módulo (ex.: boot do app.py) não paga o Playwright
+    from playwright.async_api import async_playwright
+    return async_playwright().start()
+
+
+class GerenciadorNavegador:
+    """
+    Fachada síncrona do NavegadorAsync para o app.py (Flask/gunicorn), o lote
+    e o agendador: um event loop numa thread dedicada é dono do Chromium, e
+    as tarefas enviadas por submeter() rodam nele, intercaladas.
+    """
+
+    def __init__(self, max_concorrencia=LOTE_CONCORRENCIA):
+        self.assincrono = NavegadorAsync(max_concorrencia)
+        self.max_concorrencia = self.assincrono.max_concorrencia
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="navegador", daemon=True)
+        self._thread.start()
+
+    def iniciar(self):
+        """Dispara o lançamento do navegador sem bloquear o boot da aplicação (devolve o Future)."""
+        return self._enviar(self.assincrono.iniciar())
+
+    def submeter(self, tarefa):
+        """Agenda `await tarefa(browser)` no loop do navegador e devolve o Future."""
+        return self._enviar(self.assincrono.executar(tarefa))
+
+    def aguardar(self, corrotina):
+        """Roda uma corrotina qualquer no loop do navegador e devolve o resultado."""
+        return self._enviar(corrotina).result()
+
+    def saudavel(self):
+        return self.assincrono.saudavel()
+
+    def tempos(self):
+        return self.assincrono.tempos()
+
+    def parar(self):
+        if self._loop.is_closed():
+            return
+        self.aguardar(self.assincrono.parar())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def _enviar(self, corrotina):
+        return asyncio.run_coroutine_threadsafe(corrotina, self._loop)
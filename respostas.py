@@ -0,0 +1,127 @@
+import json
+import os
+import metricas
+
+# Respostas da API comuns ao app.py (Flask) e ao asgi.py: cada função devolve
+# (corpo, status HTTP) e cada servidor só serializa. lote/script (e com eles o
+# Playwright) continuam fora do boot: só são importados dentro das funções.
+
+NAO_AUTORIZADO = ({
+    "status": "unauthorized",
+    "message": "Token inválido ou ausente."
+}, 401)
+
+OCUPADO = ({
+    "status": "busy",
+    "message": "Já existe uma execução em andamento. Aguarde finalizar antes de chamar novamente."
+}, 409)
+
+
+def token_valido(token_recebido):
+    """
+    Segurança opcional:
+    Se você definir RUN_TOKEN no Railway, será necessário chamar:
+    /run?token=SEU_TOKEN
+    ou enviar header X-RUN-TOKEN.
+    """
+    token_configurado = os.environ.get("RUN_TOKEN")
+
+    if not token_configurado:
+        return True
+
+    return token_recebido == token_configurado
+
+
+def online(navegador, fila, ocupado, mensagem="API do registro de ponto funcionando", **navegador_extra):
+    return {
+        "status": "online",
+        "message": mensagem,
+        "busy": ocupado,
+        "jobs": fila.resumo(),
+        "browser": {
+            "healthy": navegador.saudavel(),
+            **navegador_extra,
+            **navegador.tempos()
+        }
+    }, 200
+
+
+def pronto(navegador, erro_aquecimento):
+    """Readiness: 200 só com o Chromium aquecido e o fluxo importado (healthcheck do Railway)."""
+    ok = navegador.saudavel() and "script_importado" in metricas.INICIO
+    return {
+        "ready": ok,
+        "browser": {
+            "healthy": navegador.saudavel(),
+            **navegador.tempos()
+        },
+        "startup_s": dict(metricas.INICIO),
+        "error": erro_aquecimento
+    }, 200 if ok else 503
+
+
+def enfileirado(job, deduplicado):
+    return {
+        "status": "queued",
+        "job_id": job["id"],
+        "state": job["state"],
+        "deduplicated": deduplicado,
+        "status_url": f"/jobs/{job['id']}"
+    }, 202
+
+
+def estado_job(job):
+    if job is None:
+        return {
+            "status": "not_found",
+            "message": "Job não encontrado (id inválido ou já removido do histórico)."
+        }, 404
+    return job, 200
+
+
+def credenciais_lote(bruto):
+    """
+    Credenciais do POST /batch a partir do corpo cru (bytes). Corpo vazio lê o
+    BATCH_CREDENTIALS_FILE; JSON malformado ou lista inválida levantam ValueError.
+    """
+    import lote
+
+    corpo = json.loads(bruto) if bruto.strip() else None
+    if not corpo:
+        return lote.carregar_credenciais()
+    return lote.validar_credenciais(corpo.get("usuarios") if isinstance(corpo, dict) else corpo)
+
+
+def invalido(erro):
+    return {
+        "status": "invalid",
+        "error": str(erro)
+    }, 400
+
+
+def relatorio_lote(relatorio):
+    return {
+        "status": "success" if not relatorio["failed"] else ("error" if not relatorio["succeeded"] else "partial"),
+        **relatorio
+    }, 200
+
+
+def erro(e):
+    return {
+        "status": "error",
+        "error": str(e)
+    }, 500
+
+
+def gauges(navegador, fila):
+    """Gauges do /metrics que dependem do servidor (navegador aquecido e fila de jobs)."""
+    resumo = fila.resumo()
+    return [
+        metricas.gauge("ponto_navegador_saudavel", "1 se o Chromium aquecido está conectado.", int(navegador.saudavel())),
+        metricas.gauge("ponto_navegador_lancamentos", "Quantas vezes o Chromium foi lançado.",
+                       navegador.tempos()["lancamentos"]),
+        metricas.gauge("ponto_pronto", "1 quando o Chromium está aquecido e o fluxo importado.",
+                       int(navegador.saudavel() and "script_importado" in metricas.INICIO)),
+        metricas.gauge("ponto_jobs_na_fila", "Jobs aguardando execução.", resumo["queued"]),
+        metricas.gauge("ponto_jobs_rodando", "Jobs em execução.", resumo["running"]),
+    ]
@@ -1,17 +1,63 @@
+import asyncio
 import os
 import re
 import time
 from datetime import datetime
-from playwright.sync_api import sync_playwright, TimeoutError as PWTimeout
+from playwright.async_api import async_playwright, TimeoutError as PWTimeout
+import api_ponto
+import estrategias
+import evidencias
+import metricas
+from bloqueio import ContadorRede, aplicar_bloqueio
+from espera import URL_LOGIN, URL_SENIOR_X, TEM_IFRAME, aguardar_primeira, aguardar_pos_login
+from navegador import lancar_navegador, liberar_vaga, retomar_vaga
+from sessao import carregar_sessao, salvar_sessao, descartar_sessao
 
 SENIOR_USER = os.environ.get("SENIOR_USER")
 SENIOR_PASSWORD = os.environ.get("SENIOR_PASSWORD")
 
+# SENIOR_BASE_URL permite apontar para o mock local (mock_senior.py) nos benchmarks
+SENIOR_BASE_URL = os.environ.get("SENIOR_BASE_URL", "https://platform.senior.com.br").rstrip("/")
+_BASE_ESCAPADA = SENIOR_BASE_URL.replace("/", "%2F")
+
 SENIOR_URL = (
-    "https://platform.senior.com.br/login/"
-    "?redirectTo=https%3A%2F%2Fplatform.senior.com.br%2Fsenior-x%2F&tenant=g4f.com.br"
+    f"{SENIOR_BASE_URL}/login/"
+    f"?redirectTo={_BASE_ESCAPADA.replace(':', '%3A')}%2Fsenior-x%2F&tenant=g4f.com.br"
+)
+
+URL_SENIOR_X_HOME = f"{SENIOR_BASE_URL}/senior-x/#/"
+
+URL_PONTO = (
+    f"{SENIOR_BASE_URL}/senior-x/#/Gest%C3%A3o%20de%20Pessoas%20%7C%20HCM/1/"
+    "res:%2F%2Fsenior.com.br%2Fhcm%2Fpontomobile%2FclockingEvent?category=frame&"
+    f"link={_BASE_ESCAPADA}%2Fhcm-pontomobile%2Fhcm%2Fpontomobile%2F%23%2Fclocking-event&"
+    "withCredentials=true&r=0"
 )
 
+# Estratégias para achar o botão "Registrar Ponto" dentro do iframe
+ESTRATEGIAS_BOTAO = {
+    # A) CSS por classe + texto
+    "classe": lambda frame: frame.locator('button.resize-clocking-event-button:has-text("Registrar Ponto")'),
+    # B) Role + texto
+    "role": lambda frame: frame.get_by_role("button", name=re.compile("Registrar ponto", re.I)),
+    # C) id dinâmico (prefixo)
+    "id": lambda frame: frame.locator('button[id^="btn-clocking-event-"]'),
+}
+
+MENSAGENS_SUCESSO = re.compile("|".join(re.escape(m) for m in [
+    "Ponto registrado com sucesso",
+    "Registro efetuado",
+    "Marcação realizada",
+    "Seu ponto foi registrado",
+    "Operação realizada com sucesso",
+]), re.I)
+
+MENSAGENS_ERRO = re.compile("|".join(re.escape(m) for m in [
+    "Erro ao registrar",
+    "Não foi possível registrar",
+    "Falha ao registrar",
+]), re.I)
+
 def write_summary(md: str):
     """Escreve no Job Summary do GitHub Actions (aba Summary do run)."""
     path = os.environ.get("GITHUB_STEP_SUMMARY")
@@ -22,251 +68,324 @@ def write_summary(md: str):
         except Exception:
             pass
 
-def registrar_ponto():
-    log = []
+def registrar_ponto(usuario=None, senha=None, log=None, alvo=None, medicoes=None, evidencia=None, execucao_id=None):
+    """
+    Invólucro síncrono (GitHub Actions, `python script.py`): roda o
+    registrar_ponto_async num event loop próprio, com um Chromium só para ele.
+    """
+    return asyncio.run(registrar_ponto_async(
+        usuario=usuario, senha=senha, log=log, alvo=alvo, medicoes=medicoes,
+        evidencia=evidencia, execucao_id=execucao_id
+    ))
+
+
+async def registrar_ponto_async(browser=None, usuario=None, senha=None, log=None, alvo=None, medicoes=None,
+                                evidencia=None, execucao_id=None):
+    """
+    Registra o ponto na async_api do Playwright: enquanto uma execução espera
+    rede/DOM, o event loop toca as outras. Se receber um browser já lançado
+    (NavegadorAsync do navegador.py), usa só um contexto novo nele; senão lança
+    e fecha o próprio Chromium.
+
+    Sem usuario/senha usa SENIOR_USER/SENIOR_PASSWORD. Passando uma lista em `log`,
+    o chamador continua com as linhas do log mesmo se a execução falhar.
+
+    Com `alvo` (datetime com fuso), login e localização do botão acontecem antes
+    e o clique só é disparado no instante exato do alvo. Se `medicoes` for um dict,
+    recebe os números da execução ("fases", "rede", "desvio_clique_s", "evidencias").
+
+    Evidências (screenshot + HTML) seguem EVIDENCE_MODE; `evidencia=True/False`
+    força a captura nesta chamada. Ficam em EVIDENCE_DIR/<execucao_id>/.
+    """
+    medicoes = {} if medicoes is None else medicoes
+    usuario = usuario or SENIOR_USER
+    senha = senha or SENIOR_PASSWORD
+    log = [] if log is None else log
     ts = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
     log.append(f"[{ts}] Início do processo.")
 
     # sanity check
-    faltando = [k for k, v in {"SENIOR_USER": SENIOR_USER, "SENIOR_PASSWORD": SENIOR_PASSWORD}.items() if not v]
+    faltando = [k for k, v in {"SENIOR_USER": usuario, "SENIOR_PASSWORD": senha}.items() if not v]
     if faltando:
         raise RuntimeError("Variáveis ausentes: " + ", ".join(faltando))
 
-    with sync_playwright() as p:
+    rastreio = metricas.Rastreio()
+
+    # Modo API: tenta a marcação direto por HTTP, sem abrir página nenhuma
+    # (o cliente HTTP é síncrono, roda numa thread para não travar o loop)
+    if api_ponto.ativo():
+        if alvo is not None:
+            # a espera até o alvo acontece dentro do tentar: não precisa segurar vaga no navegador
+            liberar_vaga()
+        if await asyncio.to_thread(api_ponto.tentar, usuario, senha, log, alvo, medicoes, rastreio):
+            return "\n".join(log)
+        await retomar_vaga()
+
+    if browser is not None:
+        await _executar(browser, usuario, senha, log, alvo, medicoes, rastreio, evidencia, execucao_id)
+        return "\n".join(log)
+
+    async with async_playwright() as p:
         # Chromium headless (recomendado no Actions)
-        browser = p.chromium.launch(
-            headless=True,
-            args=["--no-sandbox", "--disable-dev-shm-usage"]
-        )
-        context = browser.new_context(timezone_id="America/Sao_Paulo", locale="pt-BR")
-        context.set_default_timeout(120000)
-
-        # (opcional) bloquear ruído que mantém rede ocupada
-        bloquear = ["google-analytics", "gtm", "segment", "hotjar", "doubleclick", "facebook", "sentry"]
-        def _route(route):
-            url = route.request.url.lower()
-            if any(b in url for b in bloquear):
-                return route.abort()
-            return route.continue_()
-        context.route("**/*", _route)
-
-        page = context.new_page()
-        page.set_default_timeout(120000)
+        rastreio.fase("lancamento_navegador")
+        browser = await lancar_navegador(p)
+        try:
+            await _executar(browser, usuario, senha, log, alvo, medicoes, rastreio, evidencia, execucao_id)
+        finally:
+            await browser.close()
+    return "\n".join(log)
+
+
+async def _abrir_contexto(browser, contador, estado=None):
+    """Cria contexto + página; com `estado` (storage_state) já nasce autenticado."""
+    context = await browser.new_context(
+        timezone_id="America/Sao_Paulo",
+        locale="pt-BR",
+        storage_state=estado
+    )
+    context.set_default_timeout(120000)
 
+    # bloqueia ruído e recursos pesados conforme o perfil (BLOCK_PROFILE)
+    await aplicar_bloqueio(context, contador)
+
+    page = await context.new_page()
+    page.set_default_timeout(120000)
+    return context, page
+
+
+async def _login(context, page, usuario, senha, log, rastreio):
+    """Fluxo completo de login. Devolve a página onde o Senior-X abriu."""
+    # 1) Login
+    rastreio.fase("pagina_login")
+    await page.goto(SENIOR_URL, wait_until="domcontentloaded", timeout=120000)
+    log.append("Página de login carregada.")
+
+    # fecha/clica em banners comuns (se existirem)
+    try:
+        await page.get_by_role("button", name=re.compile("aceitar|accept|ok|concordo", re.I)).click(timeout=2000)
+        log.append("Banner de cookies/consent fechado.")
+    except Exception:
+        pass
+
+    # Usuário
+    rastreio.fase("credenciais")
+    try:
+        await page.get_by_placeholder(re.compile("Usu[aá]rio|E-mail|Email", re.I)).fill(usuario, timeout=5000)
+    except PWTimeout:
+        await page.get_by_label(re.compile("Usu[aá]rio|E-mail|Email", re.I)).fill(usuario, timeout=5000)
+
+    # Alguns tenants pedem “Próximo” antes da senha
+    for texto in ["Próximo", "Continuar", "Avançar", "Next", "Continue"]:
         try:
-            # 1) Login
-            page.goto(SENIOR_URL, wait_until="domcontentloaded", timeout=120000)
-            log.append("Página de login carregada.")
+            await page.get_by_role("button", name=re.compile(texto, re.I)).click(timeout=1500)
+            await page.wait_for_timeout(500)
+            break
+        except PWTimeout:
+            pass
 
-            # fecha/clica em banners comuns (se existirem)
-            try:
-                page.get_by_role("button", name=re.compile("aceitar|accept|ok|concordo", re.I)).click(timeout=2000)
-                log.append("Banner de cookies/consent fechado.")
-            except Exception:
-                pass
+    # Senha
+    try:
+        await page.get_by_placeholder(re.compile("Senha|Password", re.I)).fill(senha, timeout=5000)
+    except PWTimeout:
+        await page.get_by_label(re.compile("Senha|Password", re.I)).fill(senha, timeout=5000)
 
-            # Usuário
-            try:
-                page.get_by_placeholder(re.compile("Usu[aá]rio|E-mail|Email", re.I)).fill(SENIOR_USER, timeout=5000)
-            except PWTimeout:
-                page.get_by_label(re.compile("Usu[aá]rio|E-mail|Email", re.I)).fill(SENIOR_USER, timeout=5000)
-
-            # Alguns tenants pedem “Próximo” antes da senha
-            for texto in ["Próximo", "Continuar", "Avançar", "Next", "Continue"]:
-                try:
-                    page.get_by_role("button", name=re.compile(texto, re.I)).click(timeout=1500)
-                    page.wait_for_timeout(500)
-                    break
-                except PWTimeout:
-                    pass
+    # Entrar
+    clicou = False
+    for texto in ["Entrar", "Acessar", "Login", "Autenticar", "Continuar", "Entrar na plataforma"]:
+        try:
+            await page.get_by_role("button", name=re.compile(texto, re.I)).click(timeout=3000)
+            clicou = True
+            break
+        except PWTimeout:
+            pass
+    if not clicou:
+        await page.locator("button").first.click(timeout=3000)
 
-            # Senha
-            try:
-                page.get_by_placeholder(re.compile("Senha|Password", re.I)).fill(SENIOR_PASSWORD, timeout=5000)
-            except PWTimeout:
-                page.get_by_label(re.compile("Senha|Password", re.I)).fill(SENIOR_PASSWORD, timeout=5000)
-
-            # Entrar
-            clicou = False
-            for texto in ["Entrar", "Acessar", "Login", "Autenticar", "Continuar", "Entrar na plataforma"]:
-                try:
-                    page.get_by_role("button", name=re.compile(texto, re.I)).click(timeout=3000)
-                    clicou = True
-                    break
-                except PWTimeout:
-                    pass
-            if not clicou:
-                page.locator("button").first.click(timeout=3000)
-
-            # Pós-login robusto: checa todas as abas e o iframe, sem 'networkidle'
-            encontrou = False
-            inicio = time.time()
-            while time.time() - inicio < 60:
-                for pg in context.pages:
-                    u = (pg.url or "").lower()
-                    if "senior-x" in u:
-                        page = pg
-                        encontrou = True
-                        break
-                    try:
-                        if pg.locator("#custom_iframe").count():
-                            page = pg
-                            encontrou = True
-                            break
-                    except Exception:
-                        pass
-                if encontrou:
-                    break
-                page.wait_for_timeout(1000)
-
-            if not encontrou:
-                # força a navegação para o Senior-X
-                try:
-                    page.goto("https://platform.senior.com.br/senior-x/#/", wait_until="domcontentloaded", timeout=60000)
-                    encontrou = True
-                except Exception:
-                    pass
-
-            # Validação final sem networkidle
-            ok = False
-            for _ in range(30):
-                if "senior-x" in (page.url or "").lower():
-                    ok = True
-                    break
-                try:
-                    if page.locator("#custom_iframe").count():
-                        ok = True
-                        break
-                except Exception:
-                    pass
-                page.wait_for_timeout(1000)
+    # Pós-login: corrida entre URL do Senior-X e iframe, em qualquer aba, sem 'networkidle'
+    rastreio.fase("pos_login")
+    condicoes = {"url senior-x": URL_SENIOR_X, "#custom_iframe": TEM_IFRAME}
+    page, espera = await aguardar_pos_login(context, page, condicoes, timeout=60000)
 
-            if not ok:
-                raise RuntimeError("Login feito, mas o Senior-X não abriu. Verifique credenciais/SSO ou bloqueios pós-login.")
+    if not espera.condicao:
+        # força a navegação para o Senior-X e valida de novo
+        try:
+            await page.goto(URL_SENIOR_X_HOME, wait_until="domcontentloaded", timeout=60000)
+        except Exception:
+            pass
+        espera = await aguardar_primeira(page, condicoes, timeout=30000)
+
+    if not espera.condicao:
+        raise RuntimeError("Login feito, mas o Senior-X não abriu. Verifique credenciais/SSO ou bloqueios pós-login.")
+
+    log.append(f"Pós-login detectado por '{espera.condicao}' em {espera.duracao_s:.2f}s.")
+    log.append(f"Login ok. URL atual: {page.url}")
+    return page
+
+
+async def _sessao_valida(page, log):
+    """
+    Depois de abrir a URL_PONTO com a sessão do cache: True se o Senior-X abriu
+    (iframe presente), False se fomos mandados de volta para o login.
+    """
+    espera = await aguardar_primeira(page, {"#custom_iframe": TEM_IFRAME, "login": URL_LOGIN}, timeout=30000)
+    if espera.condicao:
+        log.append(f"Sessão do cache verificada: '{espera.condicao}' em {espera.duracao_s:.2f}s.")
+    return espera.condicao == "#custom_iframe"
+
+
+async def _aguardar_alvo(alvo, log):
+    """Espera até o instante `alvo` sem segurar o loop: sleep grosso e, no fim, só cede a vez (sleep(0))."""
+    restante = alvo.timestamp() - time.time()
+    if restante <= 0:
+        log.append(f"Preparação terminou {-restante:.1f}s depois do alvo; clicando imediatamente.")
+        return
+
+    log.append(f"Pronto para clicar; aguardando {restante:.1f}s até o alvo.")
+    # a página já está pronta: a vaga vai para o próximo usuário fazer login enquanto este espera
+    liberar_vaga()
+    if restante > 0.02:
+        await asyncio.sleep(restante - 0.02)
+    while time.time() < alvo.timestamp():
+        await asyncio.sleep(0)
+
+
+async def _executar(browser, usuario, senha, log, alvo, medicoes, rastreio, evidencia, execucao_id):
+    rastreio.fase("contexto")
+    # Scrypt na chave do cache: fora do event loop para não travar as outras execuções
+    estado = await asyncio.to_thread(carregar_sessao, usuario, senha)
+    contador = ContadorRede()
+    context, page = await _abrir_contexto(browser, contador, estado)
+    falhou = False
 
-            log.append(f"Login ok. URL atual: {page.url}")
+    try:
+        # 1) Sessão do cache: vai direto para a tela de ponto
+        if estado is not None:
+            rastreio.fase("navegacao_ponto")
+            await page.goto(URL_PONTO, wait_until="domcontentloaded", timeout=120000)
+            rastreio.fase("sessao_cache")
+            if await _sessao_valida(page, log):
+                log.append("Sessão reaproveitada do cache (login pulado).")
+            else:
+                log.append("Sessão do cache expirou. Refazendo login completo.")
+                descartar_sessao(usuario)
+                await context.close()
+                context, page = await _abrir_contexto(browser, contador)
+                estado = None
+
+        # 1b) Login completo (o cache só é atualizado depois que o iframe confirmar a sessão)
+        login_novo = estado is None
+        if login_novo:
+            page = await _login(context, page, usuario, senha, log, rastreio)
 
             # 2) Abrir a tela de ponto (sem esperar 'networkidle')
-            url_ponto = (
-                "https://platform.senior.com.br/senior-x/#/Gest%C3%A3o%20de%20Pessoas%20%7C%20HCM/1/"
-                "res:%2F%2Fsenior.com.br%2Fhcm%2Fpontomobile%2FclockingEvent?category=frame&"
-                "link=https:%2F%2Fplatform.senior.com.br%2Fhcm-pontomobile%2Fhcm%2Fpontomobile%2F%23%2Fclocking-event&"
-                "withCredentials=true&r=0"
-            )
-            page.goto(url_ponto, wait_until="domcontentloaded", timeout=120000)
+            rastreio.fase("navegacao_ponto")
+            await page.goto(URL_PONTO, wait_until="domcontentloaded", timeout=120000)
             log.append("Tela de registro de ponto requisitada (sem esperar networkidle).")
 
-            # Aguarda o iframe #custom_iframe por polling (até ~90s)
-            frame_ok = False
-            for _ in range(90):
-                try:
-                    if page.locator("#custom_iframe").count():
-                        frame_ok = True
-                        break
-                except Exception:
-                    pass
-                page.wait_for_timeout(1000)
-
-            if not frame_ok:
-                # Evidências e falha
-                try:
-                    with open("ponto.html", "w", encoding="utf-8") as f:
-                        f.write(page.content())
-                except Exception:
-                    pass
-                try:
-                    page.screenshot(path="ponto.png", full_page=True)
-                except Exception:
-                    pass
-                raise RuntimeError("Iframe #custom_iframe não apareceu após abrir a tela de ponto.")
-
-            # 3) Clicar no botão dentro do iframe
-            sucesso = False
-            candidatos = ["Registrar Ponto", "Registrar ponto"]
-
-            frame = page.frame_locator("#custom_iframe")
-
-            # A) CSS por classe + texto
+        # Aguarda o iframe #custom_iframe (até ~90s), resolvendo assim que ele aparece
+        rastreio.fase("iframe")
+        espera = await aguardar_primeira(page, {"#custom_iframe": TEM_IFRAME}, timeout=90000)
+        if espera.condicao is None:
+            raise RuntimeError("Iframe #custom_iframe não apareceu após abrir a tela de ponto.")
+        log.append(f"Iframe #custom_iframe disponível em {espera.duracao_s:.2f}s.")
+
+        if login_novo:
+            rastreio.fase("sessao_cache")
             try:
-                frame.locator('button.resize-clocking-event-button:has-text("Registrar Ponto")').first.click(timeout=10000)
-                sucesso = True
-                log.append("Clique no botão (.resize-clocking-event-button:has-text('Registrar Ponto')).")
-            except Exception:
-                pass
-
-            # B) Role + texto
-            if not sucesso:
-                for label in candidatos:
-                    try:
-                        frame.get_by_role("button", name=label).click(timeout=8000)
-                        sucesso = True
-                        log.append(f"Clique por role/name: '{label}'.")
-                        break
-                    except Exception:
-                        continue
-
-            # C) id dinâmico (prefixo)
-            if not sucesso:
-                try:
-                    frame.locator('button[id^="btn-clocking-event-"]').first.click(timeout=8000)
+                await asyncio.to_thread(salvar_sessao, usuario, senha, await context.storage_state())
+                log.append("Sessão salva no cache.")
+            except Exception as e:
+                log.append(f"Não foi possível salvar a sessão no cache: {e}")
+
+        # 3) Clicar no botão dentro do iframe: todas as estratégias numa única espera
+        rastreio.fase("clique")
+        captura = api_ponto.CapturaRequisicao(context) if api_ponto.ativo() else None
+        frame = page.frame_locator("#custom_iframe")
+        ordem = estrategias.ordenar("botao", list(ESTRATEGIAS_BOTAO))
+        sucesso = False
+        tentada = None
+
+        combinado = None
+        for nome in ordem:
+            loc = ESTRATEGIAS_BOTAO[nome](frame)
+            combinado = loc if combinado is None else combinado.or_(loc)
+
+        try:
+            await combinado.first.wait_for(state="visible", timeout=26000)
+            # descobre qual estratégia casou (checagem instantânea, sem timeout empilhado)
+            for nome in ordem:
+                botao = ESTRATEGIAS_BOTAO[nome](frame).first
+                if await botao.is_visible():
+                    tentada = nome
+                    if alvo is not None:
+                        # checa se o botão é clicável agora, para no alvo sobrar só o clique
+                        await botao.click(trial=True, timeout=5000)
+                        rastreio.fase("espera_alvo")
+                        await _aguardar_alvo(alvo, log)
+                        rastreio.fase("clique")
+                    await botao.click(timeout=5000)
+                    if alvo is not None:
+                        # clique feito: volta a ocupar a vaga antes da validação
+                        await retomar_vaga()
+                        desvio = time.time() - alvo.timestamp()
+                        medicoes["desvio_clique_s"] = round(desvio, 3)
+                        log.append(f"Clique {desvio * 1000:+.0f} ms em relação ao alvo {alvo.strftime('%H:%M:%S')}.")
                     sucesso = True
-                    log.append("Clique no botão por id^='btn-clocking-event-'.")
-                except Exception:
-                    pass
-
-            if not sucesso:
-                # Evidências extras
-                try:
-                    with open("ponto.html", "w", encoding="utf-8") as f:
-                        f.write(page.content())
-                except Exception:
-                    pass
-                try:
-                    page.screenshot(path="ponto.png", full_page=True)
-                except Exception:
-                    pass
-                raise RuntimeError("Não encontrei o botão/ação de 'Registrar ponto'. Ajuste os seletores.")
-
-            log.append("Clique para registrar ponto efetuado. Validando sucesso…")
-
-            # 4) Verificação de sucesso (toast/texto dentro do iframe)
-            validou = False
-            for msg in [
-                "Ponto registrado com sucesso",
-                "Registro efetuado",
-                "Marcação realizada",
-                "Seu ponto foi registrado",
-                "Operação realizada com sucesso",
-                "Marcação realizada com sucesso"
-            ]:
-                try:
-                    frame.get_by_text(re.compile(msg, re.I)).first.wait_for(timeout=8000)
-                    validou = True
+                    estrategias.lembrar("botao", nome)
+                    metricas.ESTRATEGIAS.incrementar(nome, "sucesso")
+                    log.append(f"Clique no botão pela estratégia '{nome}'.")
                     break
-                except PWTimeout:
-                    continue
+        except Exception:
+            pass
 
-            if not validou:
-                log.append("Não encontrei mensagem explícita de sucesso. Considerando ok se não houve erro.")
+        if not sucesso:
+            metricas.ESTRATEGIAS.incrementar(tentada or "nenhuma", "falha")
+            raise RuntimeError("Não encontrei o botão/ação de 'Registrar ponto'. Ajuste os seletores.")
 
-            log.append("Fluxo de registro de ponto concluído.")
-            return "\n".join(log)
+        log.append("Clique para registrar ponto efetuado. Validando sucesso…")
 
-        finally:
-            # Evidências finais
-            try:
-                page.screenshot(path="ponto.png", full_page=True)
-            except Exception:
-                pass
-            try:
-                with open("ponto.html", "w", encoding="utf-8") as f:
-                    f.write(page.content())
-            except Exception:
-                pass
+        # 4) Verificação de sucesso (toast/texto dentro do iframe): qualquer mensagem de
+        #    sucesso serve; uma mensagem de erro derruba a execução
+        rastreio.fase("validacao_sucesso")
+        try:
+            toast = frame.get_by_text(MENSAGENS_SUCESSO).or_(frame.get_by_text(MENSAGENS_ERRO)).first
+            await toast.wait_for(timeout=10000)
+            mensagem = (await toast.inner_text(timeout=2000)).strip()
+            if MENSAGENS_ERRO.search(mensagem):
+                raise RuntimeError(f"O Senior recusou a marcação: '{mensagem}'.")
+            log.append(f"Mensagem de sucesso: '{mensagem}'.")
+        except PWTimeout:
+            log.append("Não encontrei mensagem explícita de sucesso. Considerando ok se não houve erro.")
+
+        if captura is not None:
+            await captura.salvar(usuario, senha, log)
+
+        log.append("Fluxo de registro de ponto concluído.")
+        metricas.EXECUCOES.incrementar("sucesso")
+
+    except Exception:
+        falhou = True
+        metricas.EXECUCOES.incrementar("falha")
+        raise
 
-            log.append("Arquivo de evidência gerado com sucesso!")
-            context.close()
-            browser.close()
+    finally:
+        # Evidências: só captura aqui; compressão e gravação vão para segundo plano
+        # falhas aqui vão só para o log: não escondem o erro original nem pulam o encerrar()
+        rastreio.fase("evidencias")
+        if evidencias.deve_capturar(falhou, evidencia):
+            try:
+                medicoes["evidencias"] = await evidencias.capturar(page, execucao_id or evidencias.novo_id(), log)
+            except Exception as e:
+                log.append(f"Não foi possível capturar as evidências: {e}")
+        medicoes["rede"] = contador.resumo()
+        log.append(contador.resumo_texto())
+        try:
+            await context.close()
+        except Exception as e:
+            log.append(f"Não foi possível fechar o contexto: {e}")
+        rastreio.encerrar()
+        medicoes["fases"] = rastreio.resumo()
+        log.append(rastreio.resumo_texto())
 
 
 if __name__ == "__main__":
@@ -279,5 +398,7 @@ if __name__ == "__main__":
         erro = f"❌ Falha ao registrar ponto: {e}"
         print(erro)
         write_summary(f"### ❌ Falha ao registrar o ponto\n- Erro: `{e}`\n")
-        write_summary("> Veja também os artifacts `ponto.png` e `ponto.html` para diagnóstico.")
+        write_summary("> Veja também o artifact `evidencias` (screenshot e HTML) para diagnóstico.")
         raise
+    finally:
+        evidencias.aguardar_gravacoes()
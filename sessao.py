@@ -0,0 +1,88 @@
+import base64
+import hashlib
+import json
+import os
+from functools import lru_cache
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+
+# Cache do storage_state do Playwright (cookies + localStorage) por usuário.
+# Cada arquivo é criptografado com Fernet; a chave é derivada com Scrypt (sal
+# aleatório gravado no próprio arquivo) de SESSION_CACHE_KEY ou, se ela não
+# existir, da própria senha do usuário.
+SESSAO_DIR = os.environ.get("SESSION_CACHE_DIR", ".sessoes")
+SESSAO_TTL = int(os.environ.get("SESSION_CACHE_TTL", str(8 * 60 * 60)))
+
+# Formato do arquivo: MAGICO + sal + token Fernet
+_MAGICO = b"PNT1"
+_TAMANHO_SAL = 16
+
+
+@lru_cache(maxsize=64)
+def _fernet(segredo: str, sal: bytes) -> Fernet:
+    # Scrypt (~50 ms) deixa caro testar senhas contra um arquivo vazado; o cache
+    # evita pagar isso de novo ao reler o mesmo arquivo no processo
+    kdf = Scrypt(salt=sal, length=32, n=2 ** 14, r=8, p=1)
+    chave = kdf.derive((os.environ.get("SESSION_CACHE_KEY") or segredo).encode("utf-8"))
+    return Fernet(base64.urlsafe_b64encode(chave))
+
+
+def _caminho(usuario: str, tipo: str) -> str:
+    nome = hashlib.sha256(usuario.encode("utf-8")).hexdigest()[:32]
+    if tipo != "sessao":
+        nome = f"{nome}-{tipo}"
+    return os.path.join(SESSAO_DIR, f"{nome}.bin")
+
+
+def carregar_sessao(usuario: str, segredo: str, tipo: str = "sessao"):
+    """
+    Devolve o storage_state salvo do usuário, ou None se não existe/expirou (TTL).
+    `tipo` separa outros dados do mesmo usuário no cache (ex.: "api" do api_ponto.py).
+    """
+    if SESSAO_TTL <= 0:
+        return None
+
+    caminho = _caminho(usuario, tipo)
+    try:
+        with open(caminho, "rb") as f:
+            conteudo = f.read()
+    except OSError:
+        return None
+
+    cabecalho = len(_MAGICO) + _TAMANHO_SAL
+    if not conteudo.startswith(_MAGICO) or len(conteudo) <= cabecalho:
+        # arquivo corrompido ou de outro formato
+        descartar_sessao(usuario, tipo)
+        return None
+    sal, token = conteudo[len(_MAGICO):cabecalho], conteudo[cabecalho:]
+
+    try:
+        # o próprio token Fernet carrega o timestamp, o TTL é validado aqui
+        return json.loads(_fernet(segredo, sal).decrypt(token, ttl=SESSAO_TTL))
+    except (InvalidToken, ValueError):
+        descartar_sessao(usuario, tipo)
+        return None
+
+
+def salvar_sessao(usuario: str, segredo: str, estado: dict, tipo: str = "sessao"):
+    """Grava o storage_state criptografado (escrita atômica, arquivo só do dono)."""
+    if SESSAO_TTL <= 0:
+        return
+
+    os.makedirs(SESSAO_DIR, mode=0o700, exist_ok=True)
+    caminho = _caminho(usuario, tipo)
+    tmp = caminho + ".tmp"
+    sal = os.urandom(_TAMANHO_SAL)
+    token = _fernet(segredo, sal).encrypt(json.dumps(estado).encode("utf-8"))
+
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(_MAGICO + sal + token)
+    os.replace(tmp, caminho)
+
+
+def descartar_sessao(usuario: str, tipo: str = "sessao"):
+    try:
+        os.remove(_caminho(usuario, tipo))
+    except OSError:
+        pass